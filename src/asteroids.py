@@ -24,29 +24,72 @@
 # Notes:
 # random.randrange returns an int
 # random.uniform returns a float
+# all random numbers come from stage.random, which is seeded per game
 # p for pause
 # j for toggle showing FPS
 # o for frame advance whilst paused
+# r held down runs the game backwards (with --rewind)
+# --threaded runs the game and the drawing on separate threads
+# --low-latency paces frames so keys are read as late as they can be
 
 import pygame
 import sys
 import os
 import random
+import threading
+import time
+from collections import deque
 from pygame.locals import *
 from util.vectorsprites import *
+from util.spatialhash import *
 from ship import *
 from stage import *
 from badies import *
 from shooter import *
 from soundManager import *
+from fontManager import *
+from controls import *
+from profiler import *
+from snapshot import *
+from renderbuffer import *
+from latency import *
 
 
 class Asteroids():
 
     explodingTtl = 180
-
-    def __init__(self):
-        self.stage = Stage('Atari Asteroids', (1024, 768))
+    tickRate = 60  # the game logic always runs at this many ticks a second
+    maxTicksPerFrame = 5
+    workMargin = 0.001  # seconds spare playLowLatency leaves each frame
+
+    # A headless game has no window, sound or HUD and runs without a
+    # frame cap, call step() to advance it
+    # frameRate is how often the screen is drawn, it doesn't change the
+    # speed of the game
+    # Games with the same seed and the same controls play out the same
+    # spriteCache draws the sprites from pre-drawn surfaces
+    def __init__(self, headless=False, dirtyRects=False, frameRate=60, seed=None,
+                 spriteCache=False):
+        self.stage = Stage('Atari Asteroids', (1024, 768), headless, dirtyRects,
+                           spriteCache)
+        self.headless = headless
+        self.frameRate = frameRate
+        self.fps = 0
+        if seed is None:
+            seed = int.from_bytes(os.urandom(4), 'little')
+        self.seed = seed & 0xFFFFFFFFFFFFFFFF  # recordings keep it in 8 bytes
+        self.random = self.stage.random
+        self.random.seed(self.seed)
+        self.controls = KeyboardControls()  # anything with read(events, keys)
+        self.controlWord = 0
+        self.recording = None  # anything with record(controls)
+        self.frameRecorder = None  # anything with capture(surface)
+        self.latency = None  # a LatencyMeter to time keys to the screen
+        self.rewind = None  # a RewindBuffer to keep the last few seconds in
+        self.rewinding = False
+        self.profiler = nullProfiler
+        self.threaded = False  # set by playThreaded
+        self.bulletGrid = SpatialHash(self.stage.width, self.stage.height)
         self.paused = False
         self.showingFPS = False
         self.frameAdvance = False
@@ -58,6 +101,11 @@ class Asteroids():
         self.score = 0
         self.ship = None
         self.lives = 0
+        self.livesList = []
+        self.startLives = 5
+        self.numRocks = 3
+        self.nextLife = 10000
+        self.explodingCount = 0
 
     def initialiseGame(self):
         self.gameState = 'playing'
@@ -78,7 +126,7 @@ class Asteroids():
 
     def createNewShip(self):
         if self.ship:
-            [self.stage.spriteList.remove(debris)
+            [self.stage.removeSprite(debris)
              for debris in self.ship.shipDebrisList]
         self.ship = Ship(self.stage)
         self.stage.addSprite(self.ship.thrustJet)
@@ -93,7 +141,7 @@ class Asteroids():
     def addLife(self, lifeNumber):
         self.lives += 1
         ship = Ship(self.stage)
-        self.stage.addSprite(ship)
+        self.stage.addSprite(ship, 'hud')
         ship.position.x = self.stage.width - \
             (lifeNumber * ship.boundingRect.width) - 10
         ship.position.y = 0 + ship.boundingRect.height
@@ -101,8 +149,8 @@ class Asteroids():
 
     def createRocks(self, numRocks):
         for _ in range(0, numRocks):
-            position = Vector2d(random.randrange(-10, 10),
-                                random.randrange(-10, 10))
+            position = Vector2d(self.random.randrange(-10, 10),
+                                self.random.randrange(-10, 10))
 
             newRock = Rock(self.stage, position, Rock.largeRockType)
             self.stage.addSprite(newRock)
@@ -112,50 +160,284 @@ class Asteroids():
 
         clock = pygame.time.Clock()
 
+        # Headless games are not capped, they run as fast as they can
+        if self.headless:
+            frameRate = 0
+        else:
+            frameRate = self.frameRate
+
+        tickTime = 1000.0 / self.tickRate
+        lag = 0.0  # time the simulation is behind the clock
+
         frameCount = 0.0
         timePassed = 0.0
-        self.fps = 0.0
         # Main loop
         while True:
 
             # calculate fps
-            timePassed += clock.tick(60)
+            elapsed = clock.tick(frameRate)
+            self.profiler.mark('wait')
+            timePassed += elapsed
             frameCount += 1
-            if frameCount % 10 == 0:  # every 10 frames
+            if frameCount % 10 == 0 and timePassed > 0:  # every 10 frames
                 # nearest integer
                 self.fps = round((frameCount / (timePassed / 1000.0)))
                 # reset counter
                 timePassed = 0
                 frameCount = 0
 
-            self.secondsCount += 1
+            if self.headless:
+                self.step()
+                continue
 
-            self.input(pygame.event.get())
+            # Run as many fixed length ticks as fit in the time that has
+            # passed. If the simulation can't keep up give up on the time
+            # it is behind rather than falling further behind every frame
+            lag = min(lag + elapsed, tickTime * self.maxTicksPerFrame)
+            while lag >= tickTime:
+                self.tick()
+                lag -= tickTime
+
+            self.render(lag / tickTime)
+
+    # Like playGame but paced with waitUntil rather than clock.tick, which
+    # can wake late. Each frame starts as late as it can and still be shown
+    # on time, so the keys read by its ticks are as fresh as they can be.
+    # The time a frame takes is the recent peak, decaying slowly
+    def playLowLatency(self):
+        frameTime = 1.0 / self.frameRate
+        tickTime = 1.0 / self.tickRate
+        workTime = 0.0
+        lag = 0.0
+
+        frameCount = 0
+        last = time.perf_counter()
+        countStart = last
+        nextFrame = last + frameTime
+        while True:
+            waitUntil(nextFrame - workTime - self.workMargin)
+            self.profiler.mark('wait')
+            start = time.perf_counter()
+
+            lag = min(lag + start - last, tickTime * self.maxTicksPerFrame)
+            last = start
+            while lag >= tickTime:
+                self.tick()
+                lag -= tickTime
+
+            self.render(lag / tickTime)
+            now = time.perf_counter()
+            workTime = max(now - start, workTime * 0.99)
+
+            # A frame that ends late starts the schedule again from now
+            # rather than rushing the frames after it
+            nextFrame += frameTime
+            if nextFrame < now:
+                nextFrame = now + frameTime
 
-            # pause
-            if self.paused and not self.frameAdvance:
-                self.displayPaused()
-                continue
+            frameCount += 1
+            if frameCount % 10 == 0:
+                self.fps = round(frameCount / (now - countStart))
+                frameCount = 0
+                countStart = now
+
+    # Run the simulation on a thread of its own while this one draws the
+    # latest frame it has published and looks after the window. Each keeps
+    # its own time, the simulation never waits for a frame to be shown
+    def playThreaded(self):
+        self.threaded = True
+        self.running = True
+        # (events, keyboard state) for the simulation, appended by this
+        # thread as pygame's input is only to be read on the main thread
+        self.events = deque()
+        self.keys = pygame.key.get_pressed()
+        self.renderBuffer = RenderBuffer()
+        self.simulationError = None
+        self.publishFrame()
+        simulation = threading.Thread(target=self.simulate, name='simulation',
+                                      daemon=True)
+        simulation.start()
 
-            self.stage.screen.fill((10, 10, 10))
-            self.stage.moveSprites()
-            self.stage.drawSprites()
-            self.doSaucerLogic()
-            self.displayScore()
-            if self.showingFPS:
-                self.displayFps()  # for debug
-            self.checkScore()
-
-            # Process keys
-            if self.gameState == 'playing':
-                self.playing()
-            elif self.gameState == 'exploding':
-                self.exploding()
-            else:
-                self.displayText()
+        clock = pygame.time.Clock()
+        frameRate = 0 if self.headless else self.frameRate
+        tickTime = 1.0 / self.tickRate
+        frameCount = 0.0
+        timePassed = 0.0
+        while self.running:
+            timePassed += clock.tick(frameRate)
+            frameCount += 1
+            if frameCount % 10 == 0 and timePassed > 0:
+                self.fps = round((frameCount / (timePassed / 1000.0)))
+                timePassed = 0
+                frameCount = 0
 
-            # Double buffer draw
-            pygame.display.flip()
+            # Anything to do with the window is handled here, on the thread
+            # that opened it, the rest is passed on to the simulation
+            events = []
+            for event in pygame.event.get():
+                if event.type == QUIT or (event.type == KEYDOWN and
+                                          event.key == K_ESCAPE):
+                    self.running = False
+                elif event.type == KEYDOWN and event.key == K_f and not self.headless:
+                    pygame.display.toggle_fullscreen()
+                    self.stage.redrawAll = True
+                else:
+                    events.append(event)
+            self.events.append((events, pygame.key.get_pressed()))
+
+            # Drawn part way from the tick before, as in playGame
+            snapshot = self.renderBuffer.latest()
+            alpha = min((time.perf_counter() - snapshot.time) / tickTime, 1.0)
+            self.renderSnapshot(snapshot, alpha)
+
+        # A simulation that failed stopped the loop, its error goes on here
+        simulation.join()
+        if self.simulationError is not None:
+            raise self.simulationError
+
+    # The simulation thread for playThreaded, ticks at tickRate and
+    # publishes a frame after each one. If it fails it keeps the error for
+    # playThreaded to raise and stops the game
+    def simulate(self):
+        tickTime = 1.0 / self.tickRate
+        nextTick = time.perf_counter()
+        try:
+            while self.running:
+                # Every event since the last tick and the newest keyboard state
+                events = []
+                while self.events:
+                    newEvents, self.keys = self.events.popleft()
+                    events.extend(newEvents)
+                self.tick(events, self.keys)
+                self.publishFrame()
+
+                # Give up on time it is too far behind to make up, as in playGame
+                nextTick += tickTime
+                delay = nextTick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif -delay > tickTime * self.maxTicksPerFrame:
+                    nextTick = time.perf_counter()
+        except BaseException as error:
+            self.simulationError = error
+            self.running = False
+
+    # Everything needed to draw the game as it is now, for the render thread
+    def publishFrame(self):
+        particles = None
+        if self.stage.particles is not None:
+            particles = self.stage.particles.copy()
+        rewindReport = None
+        if self.rewind is not None:
+            rewindReport = self.rewind.report()
+        self.renderBuffer.publish(RenderSnapshot(
+            self.stage.spritePolygons(), particles, "%02d" % self.score,
+            self.gameState, self.paused, rewindReport))
+
+    # The whole state of the game as bytes, restore() puts it back
+    def snapshot(self):
+        return takeSnapshot(self)
+
+    def restore(self, data):
+        restoreSnapshot(self, data)
+
+    # Advance the game by one tick and draw it, headless games only tick
+    def step(self):
+        self.tick()
+        if not self.headless:
+            self.render()
+
+    # Advance the simulation by one tick, the events and the state of the
+    # keyboard are read from pygame unless they are given
+    def tick(self, events=None, keys=None):
+        self.secondsCount += 1
+
+        if events is None:
+            events = pygame.event.get()
+        if keys is None:
+            keys = pygame.key.get_pressed()
+        if self.latency is not None:
+            self.latency.read(events)
+        self.input(events, keys)
+        self.profiler.mark('input')
+
+        # Holding the rewind key steps back through the rewind buffer
+        # instead of running the game
+        if self.rewinding:
+            self.rewind.stepBack(self)
+            self.profiler.mark('rewind')
+            return
+
+        # pause
+        if self.paused and not self.frameAdvance:
+            return
+
+        self.stage.moveSprites()
+        self.profiler.mark('moveSprites')
+        self.stage.updateBounds()
+        self.profiler.mark('updateBounds')
+        self.doSaucerLogic()
+        self.profiler.mark('doSaucerLogic')
+        self.checkScore()
+
+        # Process keys
+        if self.gameState == 'playing':
+            self.playing()
+        elif self.gameState == 'exploding':
+            self.exploding()
+        self.profiler.mark('checkCollisions')
+
+        if self.rewind is not None:
+            self.rewind.capture(self)
+            self.profiler.mark('rewind')
+
+    # Draw the game, alpha is how far (0 to 1) the clock has got from
+    # the last tick towards the next one
+    def render(self, alpha=1.0):
+        if self.paused:
+            alpha = 1.0
+
+        self.stage.clear()
+        self.stage.drawSprites(alpha)
+        self.profiler.mark('drawSprites')
+        self.displayScore()
+        if self.showingFPS:
+            self.displayFps()  # for debug
+        if self.gameState == 'attract_mode':
+            self.displayText()
+        self.displayPaused()
+        self.profiler.mark('hud')
+
+        # Double buffer draw
+        self.stage.flip()
+        if self.latency is not None:
+            self.latency.flipped()
+        if self.frameRecorder is not None:
+            self.frameRecorder.capture(self.stage.screen)
+        self.profiler.mark('flip')
+        self.profiler.endFrame(self.stage)
+
+    # Draw a frame published by the simulation thread, like render
+    def renderSnapshot(self, snapshot, alpha=1.0):
+        if snapshot.paused:
+            alpha = 1.0
+
+        self.stage.clear()
+        self.stage.drawPolygons(snapshot.polygons, alpha)
+        if snapshot.particles is not None:
+            self.stage.drawParticles(snapshot.particles, alpha)
+        self.displayScore(snapshot.scoreText)
+        if self.showingFPS:
+            self.displayFps(snapshot.rewindReport)
+        if snapshot.gameState == 'attract_mode':
+            self.displayText()
+        self.displayPaused(snapshot.paused)
+
+        self.stage.flip()
+        if self.latency is not None:
+            self.latency.flipped(snapshot.time)
+        if self.frameRecorder is not None:
+            self.frameRecorder.capture(self.stage.screen)
 
     def playing(self):
         if self.lives == 0:
@@ -173,7 +455,7 @@ class Asteroids():
 
         # Create a saucer
         if self.secondsCount % 2000 == 0 and self.saucer is None:
-            randVal = random.randrange(0, 10)
+            randVal = self.random.randrange(0, 10)
             if randVal <= 3:
                 self.saucer = Saucer(
                     self.stage, Saucer.smallSaucerType, self.ship)
@@ -186,7 +468,7 @@ class Asteroids():
         self.explodingCount += 1
         if self.explodingCount > self.explodingTtl:
             self.gameState = 'playing'
-            [self.stage.spriteList.remove(debris)
+            [self.stage.removeSprite(debris)
              for debris in self.ship.shipDebrisList]
             self.ship.shipDebrisList = []
 
@@ -201,46 +483,42 @@ class Asteroids():
 
     # move this kack somewhere else!
     def displayText(self):
-        font1 = pygame.font.Font('../res/Hyperspace.otf', 50)
-        font2 = pygame.font.Font('../res/Hyperspace.otf', 20)
-        font3 = pygame.font.Font('../res/Hyperspace.otf', 30)
-
-        titleText = font1.render('Asteroids', True, (180, 180, 180))
+        titleText = renderText('Asteroids', 50, (180, 180, 180))
         titleTextRect = titleText.get_rect(centerx=self.stage.width/2)
         titleTextRect.y = self.stage.height/2 - titleTextRect.height*2
-        self.stage.screen.blit(titleText, titleTextRect)
+        self.stage.blit(titleText, titleTextRect)
 
-        keysText = font2.render(
-            '(C) 1979 Atari INC.', True, (255, 255, 255))
+        keysText = renderText('(C) 1979 Atari INC.', 20, (255, 255, 255))
         keysTextRect = keysText.get_rect(centerx=self.stage.width/2)
         keysTextRect.y = self.stage.height - keysTextRect.height - 20
-        self.stage.screen.blit(keysText, keysTextRect)
+        self.stage.blit(keysText, keysTextRect)
 
-        instructionText = font3.render(
-            'Press start to Play', True, (200, 200, 200))
+        instructionText = renderText('Press start to Play', 30, (200, 200, 200))
         instructionTextRect = instructionText.get_rect(
             centerx=self.stage.width/2)
         instructionTextRect.y = self.stage.height/2 - instructionTextRect.height
-        self.stage.screen.blit(instructionText, instructionTextRect)
+        self.stage.blit(instructionText, instructionTextRect)
 
-    def displayScore(self):
-        font1 = pygame.font.Font('../res/Hyperspace.otf', 30)
-        scoreStr = str("%02d" % self.score)
-        scoreText = font1.render(scoreStr, True, (200, 200, 200))
+    def displayScore(self, scoreStr=None):
+        if scoreStr is None:
+            scoreStr = str("%02d" % self.score)
+        scoreText = renderText(scoreStr, 30, (200, 200, 200))
         scoreTextRect = scoreText.get_rect(centerx=100, centery=45)
-        self.stage.screen.blit(scoreText, scoreTextRect)
+        self.stage.blit(scoreText, scoreTextRect)
 
-    def displayPaused(self):
-        if self.paused:
-            font1 = pygame.font.Font('../res/Hyperspace.otf', 30)
-            pausedText = font1.render("Paused", True, (255, 255, 255))
+    def displayPaused(self, paused=None):
+        if paused is None:
+            paused = self.paused
+        if paused:
+            pausedText = renderText("Paused", 30, (255, 255, 255))
             textRect = pausedText.get_rect(
                 centerx=self.stage.width/2, centery=self.stage.height/2)
-            self.stage.screen.blit(pausedText, textRect)
-            pygame.display.update()
+            self.stage.blit(pausedText, textRect)
 
     # Should move the ship controls into the ship class
-    def input(self, events):
+    # Keys that only change what is shown are handled straight from the
+    # events, everything that changes the game comes in the control word
+    def input(self, events, keys):
         self.frameAdvance = False
         for event in events:
             if event.type == QUIT:
@@ -248,48 +526,63 @@ class Asteroids():
             elif event.type == KEYDOWN:
                 if event.key == K_ESCAPE:
                     sys.exit(0)
-                if self.gameState == 'playing':
-                    if event.key == K_SPACE:
-                        self.ship.fireBullet()
-                    elif event.key == K_b:
-                        self.ship.fireBullet()
-                    elif event.key == K_h:
-                        self.ship.enterHyperSpace()
-                elif self.gameState == 'attract_mode':
-                    # Start a new game
-                    if event.key == K_RETURN:
-                        self.initialiseGame()
-
-                if event.key == K_p:
-                    if self.paused:  # (is True)
-                        self.paused = False
-                    else:
-                        self.paused = True
 
                 if event.key == K_j:
                     if self.showingFPS:  # (is True)
                         self.showingFPS = False
+                        self.profiler = nullProfiler
                     else:
                         self.showingFPS = True
+                        # The profiler times the phases of one thread
+                        if not self.threaded:
+                            self.profiler = FrameProfiler(self.frameRate)
 
-                if event.key == K_f:
+                if event.key == K_f and not self.headless:
                     pygame.display.toggle_fullscreen()
+                    self.stage.redrawAll = True
 
                 # if event.key == K_k:
                     # self.killShip()
-            elif event.type == KEYUP:
-                if event.key == K_o:
-                    self.frameAdvance = True
+
+        # Rewinding is held down and isn't part of the controls, it would
+        # throw a recording out
+        self.rewinding = self.rewind is not None and keys[K_r]
+        if self.rewinding:
+            return
+
+        controls = self.controls.read(events, keys)
+        if self.recording is not None:
+            self.recording.record(controls)
+        self.controlWord = controls
+
+        if self.gameState == 'playing':
+            if controls & FIRE:
+                self.ship.fireBullet()
+            if controls & HYPERSPACE:
+                self.ship.enterHyperSpace()
+        elif self.gameState == 'attract_mode':
+            # Start a new game
+            if controls & START:
+                self.initialiseGame()
+
+        if controls & PAUSE:
+            if self.paused:  # (is True)
+                self.paused = False
+            else:
+                self.paused = True
+
+        if controls & FRAME_ADVANCE:
+            self.frameAdvance = True
 
     def processKeys(self):
-        key = pygame.key.get_pressed()
+        controls = self.controlWord
 
-        if key[K_LEFT] or key[K_z]:
+        if controls & LEFT:
             self.ship.rotateLeft()
-        elif key[K_RIGHT] or key[K_x]:
+        elif controls & RIGHT:
             self.ship.rotateRight()
 
-        if key[K_UP] or key[K_n]:
+        if controls & THRUST:
             self.ship.increaseThrust()
             self.ship.thrustJet.accelerating = True
         else:
@@ -303,9 +596,20 @@ class Asteroids():
         newRocks = []
         shipHit, saucerHit = False, False
 
-        # Rocks
-        for rock in self.rockList:
+        # File every live bullet under the grid cells it covers so each rock
+        # is only tested against the bullets near it
+        self.bulletGrid.clear()
+        for bullet in self.ship.bullets:
+            self.bulletGrid.insert(bullet, bullet.boundingRect)
+        if self.saucer is not None:
+            for bullet in self.saucer.bullets:
+                self.bulletGrid.insert(bullet, bullet.boundingRect)
+            nearSaucer = self.bulletGrid.query(self.saucer.boundingRect)
+
+        # Rocks, walk a copy as hit rocks are taken out of the list
+        for rock in list(self.rockList):
             rockHit = False
+            nearRock = self.bulletGrid.query(rock.boundingRect)
 
             if not self.ship.inHyperSpace and rock.collidesWith(self.ship):
                 p = rock.checkPolygonCollision(self.ship)
@@ -318,19 +622,19 @@ class Asteroids():
                     saucerHit = True
                     rockHit = True
 
-                if self.saucer.bulletCollision(rock):
+                if self.saucer.bulletCollision(rock, nearRock):
                     rockHit = True
 
-                if self.ship.bulletCollision(self.saucer):
+                if self.ship.bulletCollision(self.saucer, nearSaucer):
                     saucerHit = True
                     self.score += self.saucer.scoreValue
 
-            if self.ship.bulletCollision(rock):
+            if self.ship.bulletCollision(rock, nearRock):
                 rockHit = True
 
             if rockHit:
                 self.rockList.remove(rock)
-                self.stage.spriteList.remove(rock)
+                self.stage.removeSprite(rock)
 
                 if rock.rockType == Rock.largeRockType:
                     playSound("explode1")
@@ -347,8 +651,7 @@ class Asteroids():
                 if rock.rockType != Rock.smallRockType:
                     # new rocks
                     for _ in range(0, 2):
-                        position = Vector2d(rock.position.x, rock.position.y)
-                        newRock = Rock(self.stage, position, newRockType)
+                        newRock = Rock(self.stage, rock.position.copy(), newRockType)
                         self.stage.addSprite(newRock)
                         self.rockList.append(newRock)
 
@@ -357,7 +660,8 @@ class Asteroids():
         # Saucer bullets
         if self.saucer is not None:
             if not self.ship.inHyperSpace:
-                if self.saucer.bulletCollision(self.ship):
+                nearShip = self.bulletGrid.query(self.ship.boundingRect)
+                if self.saucer.bulletCollision(self.ship, nearShip):
                     shipHit = True
 
                 if self.saucer.collidesWith(self.ship):
@@ -396,18 +700,34 @@ class Asteroids():
         self.saucer = None
 
     def createDebris(self, sprite):
+        if self.stage.particles is not None:
+            self.stage.particles.emit(
+                sprite.position.x, sprite.position.y, 25, self.random)
+            return
+
         for _ in range(0, 25):
-            position = Vector2d(sprite.position.x, sprite.position.y)
-            debris = Debris(position, self.stage)
+            debris = self.stage.pool(newDebris).acquire(
+                self.stage, sprite.position.x, sprite.position.y)
             self.stage.addSprite(debris)
 
-    def displayFps(self):
-        font2 = pygame.font.Font('../res/Hyperspace.otf', 15)
+    # rewindReport is given when drawing on another thread from the game
+    def displayFps(self, rewindReport=None):
         fpsStr = str(self.fps)+(' FPS')
-        scoreText = font2.render(fpsStr, True, (255, 255, 255))
+        scoreText = renderText(fpsStr, 15, (255, 255, 255))
         scoreTextRect = scoreText.get_rect(
             centerx=(self.stage.width/2), centery=15)
-        self.stage.screen.blit(scoreText, scoreTextRect)
+        self.stage.blit(scoreText, scoreTextRect)
+        if self.rewind is not None:
+            if rewindReport is None:
+                rewindReport = self.rewind.report()
+            rewindText = renderText(rewindReport, 15, (255, 255, 255))
+            self.stage.blit(rewindText, rewindText.get_rect(
+                centerx=(self.stage.width/2), centery=30))
+        if self.latency is not None:
+            latencyText = renderText(self.latency.report(), 15, (255, 255, 255))
+            self.stage.blit(latencyText, latencyText.get_rect(
+                centerx=(self.stage.width/2), centery=45))
+        self.profiler.draw(self.stage, 10, 80)
 
     def checkScore(self):
         if self.score > 0 and self.score > self.nextLife:
@@ -417,13 +737,89 @@ class Asteroids():
 
 
 # Script to run the game
-if not pygame.font:
-    print('Warning, fonts disabled')
-if not pygame.mixer:
-    print('Warning, sound disabled')
-
-initSoundManager()
-game = Asteroids()  # create object game from class Asteroids
-game.playGame()
+if __name__ == "__main__":
+    if not pygame.font:
+        print('Warning, fonts disabled')
+    if not pygame.mixer:
+        print('Warning, sound disabled')
+
+    headless = '--headless' in sys.argv
+    dirtyRects = '--dirty-rects' in sys.argv
+    spriteCache = '--sprite-cache' in sys.argv
+    frameRate = 60
+    for arg in sys.argv:
+        if arg.startswith('--fps='):
+            frameRate = int(arg[len('--fps='):])
+            if frameRate <= 0:
+                print('--fps must be more than 0')
+                sys.exit(1)
+    if not headless:
+        initSoundManager()
+    # create object game from class Asteroids
+    game = Asteroids(headless, dirtyRects, frameRate, spriteCache=spriteCache)
+
+    # --record=file saves the game's seed and controls to play back later
+    # with replay.py
+    for arg in sys.argv:
+        if arg.startswith('--record='):
+            import atexit
+            from replay import Recording
+            game.recording = Recording(game.seed)
+            atexit.register(game.recording.save, arg[len('--record='):])
+
+    # --rewind=seconds keeps that many seconds (10 if not given) to run
+    # backwards through with the R key
+    for arg in sys.argv:
+        if arg.startswith('--rewind'):
+            if game.recording is not None:
+                print('--rewind can not be used with --record')
+                sys.exit(1)
+            import atexit
+            from rewind import RewindBuffer
+            seconds = 10
+            if arg.startswith('--rewind='):
+                seconds = int(arg[len('--rewind='):])
+            game.rewind = RewindBuffer(seconds, game.tickRate)
+            atexit.register(lambda: print(game.rewind.report()))
+
+    # --capture=directory saves every frame shown as a PNG,
+    # --capture=file.frames saves them compressed into one file
+    for arg in sys.argv:
+        if arg.startswith('--capture='):
+            import atexit
+            from framerecorder import FrameRecorder
+            game.frameRecorder = FrameRecorder(arg[len('--capture='):])
+
+            def closeFrameRecorder():
+                try:
+                    game.frameRecorder.close()
+                finally:
+                    print(game.frameRecorder.report())
+            atexit.register(closeFrameRecorder)
+
+    # --latency times each key press to the flip that shows it, shown with
+    # the FPS and printed on exit
+    if '--latency' in sys.argv:
+        import atexit
+        game.latency = LatencyMeter()
+        atexit.register(lambda: print(game.latency.report()))
+
+    # --threaded runs the simulation and the drawing on separate threads,
+    # --low-latency paces the frames to read the keys as late as it can
+    if '--threaded' in sys.argv and '--low-latency' in sys.argv:
+        print('--threaded can not be used with --low-latency')
+        sys.exit(1)
+    if '--threaded' in sys.argv and spriteCache:
+        print('--threaded can not be used with --sprite-cache')
+        sys.exit(1)
+    if headless and '--low-latency' in sys.argv:
+        print('--headless can not be used with --low-latency')
+        sys.exit(1)
+    if '--threaded' in sys.argv:
+        game.playThreaded()
+    elif '--low-latency' in sys.argv:
+        game.playLowLatency()
+    else:
+        game.playGame()
 
 ####
@@ -25,6 +25,8 @@ from soundManager import *
 # Smaller rocks are faster.
 class Rock(VectorSprite):
     
+    layer = 'rocks'
+
     # indexes into the tuples below
     largeRockType = 0
     mediumRockType = 1
@@ -33,15 +35,24 @@ class Rock(VectorSprite):
     velocities = (1.5, 3.0, 4.5)    
     scales = (2.5, 1.5, 0.6)
 
-    # tracks the last rock shape to be generated
-    rockShape = 1    
-    
+    # The four rock shapes before scaling
+    shapes = (
+        [(-4,-12), (6,-12), (13, -4), (13, 5), (6, 13), (0,13), (0,4),
+         (-8,13), (-15, 4), (-7,1), (-15,-3)],
+        [(-6,-12), (1,-5), (8, -12), (15, -5), (12,0), (15,6), (5,13),
+         (-7,13), (-14,7), (-14,-5)],
+        [(-7,-12), (1,-9), (8,-12), (15,-5), (8,-3), (15,4), (8,12),
+         (-3,10), (-6,12), (-14,7), (-10,0), (-14,-5)],
+        [(-7,-11), (3,-11), (13,-5), (13,-2), (2,2), (13,8), (6,14),
+         (2,10), (-7,14), (-15,5), (-15,-5), (-5,-5), (-7,-11)])
+
     # Create the rock polygon to the given scale
     def __init__(self, stage, position, rockType):
         
+        self.stage = stage
         scale = Rock.scales[rockType]
         velocity = Rock.velocities[rockType]                
-        heading = Vector2d(random.uniform(-velocity, velocity), random.uniform(-velocity, velocity))
+        heading = Vector2d(stage.random.uniform(-velocity, velocity), stage.random.uniform(-velocity, velocity))
         
         # Ensure that the rocks don't just sit there or move along regular lines
         if heading.x == 0:
@@ -56,28 +67,16 @@ class Rock(VectorSprite):
         VectorSprite.__init__(self, position, heading, newPointList)
                 
     
-    # Create different rock type pointlists    
+    # Pick the next rock shape, the stage tracks the last rock shape to be
+    # generated. The rock remembers its shape (1 to 4) so it can be saved
     def createPointList(self):
         
-        if (Rock.rockShape == 1):
-            pointlist = [(-4,-12), (6,-12), (13, -4), (13, 5), (6, 13), (0,13), (0,4),\
-                     (-8,13), (-15, 4), (-7,1), (-15,-3)]
- 
-        elif (Rock.rockShape == 2):
-            pointlist = [(-6,-12), (1,-5), (8, -12), (15, -5), (12,0), (15,6), (5,13),\
-                         (-7,13), (-14,7), (-14,-5)]
-            
-        elif (Rock.rockShape == 3):
-            pointlist = [(-7,-12), (1,-9), (8,-12), (15,-5), (8,-3), (15,4), (8,12),\
-                         (-3,10), (-6,12), (-14,7), (-10,0), (-14,-5)]            
-
-        elif (Rock.rockShape == 4):
-            pointlist = [(-7,-11), (3,-11), (13,-5), (13,-2), (2,2), (13,8), (6,14),\
-                         (2,10), (-7,14), (-15,5), (-15,-5), (-5,-5), (-7,-11)]
+        self.shape = self.stage.rockShape
+        pointlist = Rock.shapes[self.shape - 1]
 
-        Rock.rockShape += 1
-        if (Rock.rockShape == 5):
-            Rock.rockShape = 1
+        self.stage.rockShape += 1
+        if (self.stage.rockShape == 5):
+            self.stage.rockShape = 1
 
         return pointlist
     
@@ -95,10 +94,14 @@ class Rock(VectorSprite):
 class Debris(Point):    
      
     def __init__(self, position, stage):
-        heading = Vector2d(random.uniform(-1.5, 1.5), random.uniform(-1.5, 1.5))
+        heading = Vector2d(stage.random.uniform(-1.5, 1.5), stage.random.uniform(-1.5, 1.5))
         Point.__init__(self, position, heading, stage)
         self.ttl = 50
     
+    def reset(self, stage, x, y):
+        Point.reset(self, stage, x, y, stage.random.uniform(-1.5, 1.5), stage.random.uniform(-1.5, 1.5))
+        self.ttl = 50
+    
     def move(self):    
         Point.move(self)
         r,g,b = self.color
@@ -108,6 +111,11 @@ class Debris(Point):
         self.color = (r,g,b)
         
 
+def newDebris(stage, x, y):
+    return Debris(Vector2d(x, y), stage)
+
+
+
 # Flying saucer, shoots at player
 class Saucer(Shooter):
     
@@ -124,7 +132,7 @@ class Saucer(Shooter):
     bulletVelocity = 5  
     
     def __init__(self, stage, saucerType, ship):                
-        position = Vector2d(0.0, random.randrange(0, stage.height))
+        position = Vector2d(0.0, stage.random.randrange(0, stage.height))
         heading = Vector2d(self.velocities[saucerType], 0.0)
         self.saucerType = saucerType
         self.ship = ship
@@ -162,13 +170,13 @@ class Saucer(Shooter):
     # Set the bullet velocity and create the bullet
     def fireBullet(self):
         if self.ship is not None:            
-            dx = self.ship.position.x - self.position.x
-            dy = self.ship.position.y - self.position.y
-            mag = math.sqrt(dx*dx + dy*dy);
-            heading = Vector2d(self.bulletVelocity * (dx/mag), self.bulletVelocity * (dy/mag))
-            position = Vector2d(self.position.x, self.position.y)          
+            toShip = self.ship.position - self.position
+            # Right on top of the ship there is no way to aim, so hold fire
+            if toShip.length() == 0:
+                return
+            heading = toShip.normalize() * self.bulletVelocity
             shotFired = Shooter.fireBullet(self, heading, self.bulletTtl[self.saucerType], self.bulletVelocity)
             if shotFired:
                 playSound("sfire")
             
-# end    
\ No newline at end of file
+# end    
\ No newline at end of file
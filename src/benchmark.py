@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+# Time the frame pipeline on scripted scenarios.
+#
+# Each scenario sets up a seeded headless game, then runs it for a fixed
+# number of frames timing each phase of the frame separately. The results
+# are written out as JSON so runs on different builds can be compared.
+#
+# Usage: python3 benchmark.py [--frames=N] [--output=file.json] [scenario ...]
+
+import argparse
+import json
+import platform
+import sys
+from asteroids import *
+
+seed = 1979
+
+
+# Scenario set ups, each is given a new game that has just been started
+# and returns a function called before every frame
+
+def manyRocks(numRocks):
+    def setup(game):
+        [game.stage.removeSprite(rock) for rock in game.rockList]
+        game.rockList = []
+        game.createRocks(numRocks)
+        return None
+    return setup
+
+
+def bulletStorm(game):
+    game.ship.maxBullets = 200
+
+    def everyFrame(game, frame):
+        game.ship.rotateLeft()
+        game.ship.fireBullet()
+    return everyFrame
+
+
+def saucerFiring(game):
+    def everyFrame(game, frame):
+        if game.saucer is None:
+            game.saucer = Saucer(game.stage, frame % 2, game.ship)
+            game.stage.addSprite(game.saucer)
+    return everyFrame
+
+
+# Ten explosions a frame from fixed places across the screen, whatever
+# rocks happen to be about
+def massExplosions(game):
+    width = game.stage.width
+    height = game.stage.height
+    blasts = [VectorSprite(Vector2d(width * (i + 0.5) / 10, height * (i % 3 + 1) / 4),
+                           Vector2d(0, 0), [])
+              for i in range(10)]
+
+    def everyFrame(game, frame):
+        for blast in blasts:
+            game.createDebris(blast)
+    return everyFrame
+
+
+scenarios = {
+    'rocks10': manyRocks(10),
+    'rocks100': manyRocks(100),
+    'rocks1000': manyRocks(1000),
+    'bulletStorm': bulletStorm,
+    'saucerFiring': saucerFiring,
+    'massExplosions': massExplosions,
+}
+
+# The profiler's sections, leaving out the time between frames
+phases = tuple(section for section in FrameProfiler.sections if section != 'wait')
+
+
+# Run the scenario through the game's own tick and render with the frame
+# profiler timing the phases, as the J key overlay does
+def runScenario(name, frames):
+    game = Asteroids(headless=True, seed=seed)
+    game.initialiseGame()
+    everyFrame = scenarios[name](game)
+
+    # Plenty of lives so the ship survives the whole run
+    game.lives = frames
+
+    profiler = FrameProfiler(historyLength=frames)
+    game.profiler = profiler
+    spriteCount = 0
+    particleCount = 0
+    for frame in range(frames):
+        if everyFrame is not None:
+            everyFrame(game, frame)
+        profiler.mark('wait')
+        game.tick((), noKeys)
+        game.render()
+
+        spriteCount += len(game.stage.sprites)
+        if game.stage.particles is not None:
+            particleCount += game.stage.particles.count
+
+    result = {'frames': frames,
+              'meanSprites': spriteCount / frames,
+              'meanParticles': particleCount / frames,
+              'phases': {}}
+    total = 0.0
+    for phase in phases:
+        samples = sorted(profiler.history[phase])  # ms
+        total += sum(samples) / 1000.0
+        result['phases'][phase] = {
+            'totalMs': sum(samples),
+            'meanUs': sum(samples) / frames * 1000.0,
+            'p50Us': samples[frames // 2] * 1000.0,
+            'p95Us': samples[min(frames - 1, frames * 95 // 100)] * 1000.0,
+            'maxUs': samples[-1] * 1000.0,
+        }
+    result['totalMs'] = total * 1000.0
+    result['framesPerSecond'] = frames / total
+    return result
+
+
+# Scenario names for argparse, which also checks the empty list it uses
+# when no names are given against the choices
+class ScenarioNames(tuple):
+
+    def __contains__(self, name):
+        return name == [] or tuple.__contains__(self, name)
+
+
+def positiveInt(text):
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError('%s is not a positive number' % text)
+    return value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time the frame pipeline on scripted scenarios.')
+    parser.add_argument('--frames', type=positiveInt, default=600)
+    parser.add_argument('--output', help='write the JSON results to this file')
+    parser.add_argument('names', nargs='*', metavar='scenario',
+                        choices=ScenarioNames(scenarios),
+                        help='any of %s, all of them if none are given' % ', '.join(scenarios))
+    arguments = parser.parse_args()
+    frames = arguments.frames
+    output = arguments.output
+    names = arguments.names or list(scenarios)
+
+    results = {'python': platform.python_version(),
+               'pygame': pygame.version.ver,
+               'numpy': numpy.__version__ if numpy is not None else None,
+               'seed': seed,
+               'scenarios': {}}
+    for name in names:
+        results['scenarios'][name] = runScenario(name, frames)
+        print('%-16s %8.1f fps' % (name, results['scenarios'][name]['framesPerSecond']),
+              file=sys.stderr)
+
+    if output is None:
+        print(json.dumps(results, indent=2))
+    else:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,73 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+import pygame
+from pygame.locals import *
+
+# Everything the player can do in one game tick packed into a single byte,
+# the control word. The first three are keys held down, the rest are keys
+# pressed during the tick
+LEFT = 1
+RIGHT = 2
+THRUST = 4
+FIRE = 8
+HYPERSPACE = 16
+START = 32
+PAUSE = 64
+FRAME_ADVANCE = 128
+
+
+# A keyboard with nothing held down, for games played without one. One
+# shared instance, noKeys, does for all of them
+class NoKeys:
+
+    def __getitem__(self, key):
+        return False
+
+
+noKeys = NoKeys()
+
+
+# Reads the control word from the keyboard
+class KeyboardControls:
+
+    # keys is the state of the keyboard from pygame.key.get_pressed()
+    def read(self, events, keys):
+        controls = 0
+        for event in events:
+            if event.type == KEYDOWN:
+                if event.key == K_SPACE or event.key == K_b:
+                    controls |= FIRE
+                elif event.key == K_h:
+                    controls |= HYPERSPACE
+                elif event.key == K_RETURN:
+                    controls |= START
+                elif event.key == K_p:
+                    controls |= PAUSE
+            elif event.type == KEYUP:
+                if event.key == K_o:
+                    controls |= FRAME_ADVANCE
+
+        if keys[K_LEFT] or keys[K_z]:
+            controls |= LEFT
+        if keys[K_RIGHT] or keys[K_x]:
+            controls |= RIGHT
+        if keys[K_UP] or keys[K_n]:
+            controls |= THRUST
+
+        return controls
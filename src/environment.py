@@ -0,0 +1,199 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+# A Gym style environment for training agents against the game.
+#
+#     env = AsteroidsEnv()
+#     observation, info = env.reset(seed=1)
+#     while True:
+#         observation, reward, terminated, truncated, info = env.step(action)
+#         if terminated or truncated:
+#             break
+#
+# Each step runs one game tick, headless, with the action standing in for
+# the keyboard. Actions are indexes into actionWords, the control words an
+# agent can choose from.
+#
+# The observation is a dict of NumPy arrays that are allocated once and
+# filled in place every step, copy them to keep them past the next step:-
+#     ship     [x, y, headingX, headingY, angle, alive, inHyperSpace]
+#     rocks    one row per rock, [x, y, headingX, headingY, rockType]
+#     saucer   [present, x, y, headingX, headingY, saucerType]
+#     bullets  one row per bullet, [x, y, headingX, headingY, fromShip]
+#     counts   [rocks, bullets], the rows in use, the rest are zero
+#     pixels   only when pixels is given, the last frameStack greyscale
+#              frames of the sprites, oldest first, [frame, row, column]
+# Rocks and bullets past maxRocks and maxBullets are left out.
+#
+# The reward is the score gained in the step, less lifePenalty for each
+# life lost (and plus it for each extra life). The episode ends when the
+# last life has gone.
+
+import numpy
+
+from asteroids import Asteroids
+from controls import *
+from pixels import *
+
+# The control words an action can be, the index is the action
+actionWords = (
+    0,
+    LEFT,
+    RIGHT,
+    THRUST,
+    FIRE,
+    THRUST | LEFT,
+    THRUST | RIGHT,
+    FIRE | LEFT,
+    FIRE | RIGHT,
+    FIRE | THRUST,
+    FIRE | THRUST | LEFT,
+    FIRE | THRUST | RIGHT,
+    HYPERSPACE,
+)
+
+
+class AsteroidsEnv:
+
+    maxRocks = 64
+    maxBullets = 16
+    lifePenalty = 1000
+
+    # maxTicks truncates episodes that go on too long, None never does
+    # pixels is the (width, height) of pixel observations, None for none
+    def __init__(self, maxTicks=None, pixels=None, frameStack=4):
+        self.maxTicks = maxTicks
+        self.pixels = pixels
+        self.frameStack = frameStack
+        self.frames = None
+        self.actionCount = len(actionWords)
+        self.game = None
+        self.controlWord = 0
+        self.ticks = 0
+        self.lastScore = 0
+        self.lastLives = 0
+
+        self.ship = numpy.zeros(7, dtype=numpy.float32)
+        self.rocks = numpy.zeros((self.maxRocks, 5), dtype=numpy.float32)
+        self.saucer = numpy.zeros(6, dtype=numpy.float32)
+        self.bullets = numpy.zeros((self.maxBullets, 5), dtype=numpy.float32)
+        self.counts = numpy.zeros(2, dtype=numpy.int32)
+        self.observation = {
+            'ship': self.ship,
+            'rocks': self.rocks,
+            'saucer': self.saucer,
+            'bullets': self.bullets,
+            'counts': self.counts,
+        }
+        self.info = {'score': 0, 'lives': 0, 'ticks': 0}
+
+    # Start a new game, a seed plays out the same way for the same actions
+    def reset(self, seed=None):
+        self.game = Asteroids(headless=True, seed=seed)
+        self.game.controls = self  # the game reads its controls from read()
+        self.game.initialiseGame()
+        self.controlWord = 0
+        self.ticks = 0
+        self.lastScore = self.game.score
+        self.lastLives = self.game.lives
+        self.observe()
+        if self.pixels is not None:
+            renderer = PixelRenderer(self.game.stage, self.pixels)
+            self.frames = FrameStack(renderer, self.frameStack)
+            self.observation['pixels'] = self.frames.reset()
+        return self.observation, self.updateInfo()
+
+    def step(self, action):
+        game = self.game
+        self.controlWord = actionWords[action]
+        game.tick((), noKeys)  # the action is the only input
+        self.ticks += 1
+
+        reward = (game.score - self.lastScore) + \
+            (game.lives - self.lastLives) * self.lifePenalty
+        self.lastScore = game.score
+        self.lastLives = game.lives
+
+        terminated = game.gameState == 'attract_mode'
+        truncated = self.maxTicks is not None and self.ticks >= self.maxTicks
+        self.observe()
+        if self.frames is not None:
+            self.observation['pixels'] = self.frames.push()
+        return self.observation, reward, terminated, truncated, self.updateInfo()
+
+    # The game calls this for its control word each tick
+    def read(self, events, keys):
+        return self.controlWord
+
+    def updateInfo(self):
+        self.info['score'] = self.game.score
+        self.info['lives'] = self.game.lives
+        self.info['ticks'] = self.ticks
+        return self.info
+
+    # Copy the game state into the observation arrays
+    def observe(self):
+        game = self.game
+
+        ship = self.ship
+        ship[0] = game.ship.position.x
+        ship[1] = game.ship.position.y
+        ship[2] = game.ship.heading.x
+        ship[3] = game.ship.heading.y
+        ship[4] = game.ship.angle % 360
+        ship[5] = game.gameState == 'playing' and game.ship.visible
+        ship[6] = game.ship.inHyperSpace
+
+        rocks = self.rocks
+        rockCount = min(len(game.rockList), self.maxRocks)
+        for i in range(rockCount):
+            rock = game.rockList[i]
+            rocks[i, 0] = rock.position.x
+            rocks[i, 1] = rock.position.y
+            rocks[i, 2] = rock.heading.x
+            rocks[i, 3] = rock.heading.y
+            rocks[i, 4] = rock.rockType
+        rocks[rockCount:] = 0
+
+        saucer = self.saucer
+        if game.saucer is not None:
+            saucer[0] = 1
+            saucer[1] = game.saucer.position.x
+            saucer[2] = game.saucer.position.y
+            saucer[3] = game.saucer.heading.x
+            saucer[4] = game.saucer.heading.y
+            saucer[5] = game.saucer.saucerType
+        else:
+            saucer[:] = 0
+
+        bullets = self.bullets
+        bulletCount = 0
+        for bullet in game.stage.sprites.layers['bullets']:
+            if bulletCount == self.maxBullets:
+                break
+            if bullet.ttl > 0:
+                bullets[bulletCount, 0] = bullet.position.x
+                bullets[bulletCount, 1] = bullet.position.y
+                bullets[bulletCount, 2] = bullet.heading.x
+                bullets[bulletCount, 3] = bullet.heading.y
+                bullets[bulletCount, 4] = bullet.shooter is game.ship
+                bulletCount += 1
+        bullets[bulletCount:] = 0
+
+        self.counts[0] = rockCount
+        self.counts[1] = bulletCount
@@ -0,0 +1,51 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+import pygame
+from collections import OrderedDict
+
+defaultFont = '../res/Hyperspace.otf'
+
+fonts = {}  # each (font file, size) is only loaded once
+texts = OrderedDict()  # rendered text, least recently used first
+maxTexts = 64
+
+
+def getFont(size, fontName=defaultFont):
+    key = (fontName, size)
+    font = fonts.get(key)
+    if font is None:
+        font = pygame.font.Font(fontName, size)
+        fonts[key] = font
+    return font
+
+
+# Render antialiased text, or hand back the surface from last time if the
+# same string has been rendered in the same font, size and colour
+def renderText(text, size, color, fontName=defaultFont):
+    key = (fontName, size, text, color)
+    surface = texts.get(key)
+    if surface is not None:
+        texts.move_to_end(key)
+        return surface
+
+    surface = getFont(size, fontName).render(text, True, color)
+    texts[key] = surface
+    if len(texts) > maxTexts:
+        texts.popitem(last=False)
+    return surface
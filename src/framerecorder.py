@@ -0,0 +1,164 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+# Capture the frames the game draws for gameplay review.
+#
+# The game hands every frame it shows to capture(), which copies the pixels
+# and puts them on a bounded queue. A writer thread takes them off the queue
+# and saves them, so the game loop never waits on the disk. Once the queue
+# is half full only every other frame is kept, and when it is full frames
+# are dropped. Both are counted and reported when the recorder is closed.
+# If the writer fails it stops, its error is raised again by close().
+#
+# Frames are written either as a numbered PNG sequence in a directory or
+# into one frames file, all little endian:-
+#     4 bytes  'ASTF'
+#     1 byte   format version
+#     2 bytes  width
+#     2 bytes  height
+#     then for each frame a 4 byte length and the zlib compressed RGB
+#     pixels, compression level 0 stores them raw
+#
+# Usage: python3 framerecorder.py game.frames directory
+# writes the frames of a frames file out as PNGs
+
+import os
+import queue
+import struct
+import sys
+import threading
+import zlib
+
+import pygame
+
+magic = b'ASTF'
+version = 1
+header = struct.Struct('<4sBHH')
+frameLength = struct.Struct('<I')
+
+
+class FrameRecorder:
+
+    maxQueue = 120  # frames, two seconds at 60 frames a second
+    closeTimeout = 10.0  # seconds close() waits for the writer to finish
+
+    # A path ending in .frames is written as a frames file, anything else
+    # is a directory for PNGs
+    def __init__(self, path, compression=1, maxQueue=None):
+        if maxQueue is not None:
+            self.maxQueue = maxQueue
+        self.path = path
+        self.png = not path.endswith('.frames')
+        self.compression = compression
+        self.queue = queue.Queue(self.maxQueue)
+        self.size = None
+        self.captured = 0
+        self.written = 0
+        self.skipped = 0  # left out to halve the frame rate
+        self.dropped = 0  # left out because the queue was full
+        self.stopping = threading.Event()
+        self.error = None  # what stopped the writer, if anything did
+        self.thread = threading.Thread(target=self.write, daemon=True)
+        self.thread.start()
+
+    # Called with the screen after each flip
+    def capture(self, surface):
+        self.captured += 1
+        if self.queue.qsize() * 2 >= self.maxQueue and self.captured % 2:
+            self.skipped += 1
+            return
+
+        try:
+            self.queue.put_nowait(
+                (surface.get_size(), pygame.image.tobytes(surface, 'RGB')))
+        except queue.Full:
+            self.dropped += 1
+
+    # Body of the writer thread, runs until it is stopping and the queue
+    # is empty
+    def write(self):
+        frameFile = None
+        try:
+            if self.png:
+                os.makedirs(self.path, exist_ok=True)
+
+            while True:
+                try:
+                    size, pixels = self.queue.get(timeout=0.1)
+                except queue.Empty:
+                    if self.stopping.is_set():
+                        break
+                    continue
+
+                if self.png:
+                    image = pygame.image.frombytes(pixels, size, 'RGB')
+                    pygame.image.save(image, os.path.join(
+                        self.path, 'frame%06d.png' % self.written))
+                else:
+                    if frameFile is None:
+                        frameFile = open(self.path, 'wb')
+                        frameFile.write(header.pack(magic, version, *size))
+                    data = zlib.compress(pixels, self.compression)
+                    frameFile.write(frameLength.pack(len(data)))
+                    frameFile.write(data)
+                self.written += 1
+        except Exception as error:
+            self.error = error
+        finally:
+            if frameFile is not None:
+                frameFile.close()
+
+    # Write out what is left on the queue and stop the writer thread. Never
+    # waits more than closeTimeout, raises whatever stopped the writer
+    def close(self):
+        self.stopping.set()
+        self.thread.join(self.closeTimeout)
+        if self.error is not None:
+            raise self.error
+        if self.thread.is_alive():
+            raise RuntimeError('frame writer still busy after %g seconds, %d frames not written'
+                               % (self.closeTimeout, self.queue.qsize()))
+
+    def report(self):
+        return ('%d frames captured, %d written, %d skipped, %d dropped' %
+                (self.captured, self.written, self.skipped, self.dropped))
+
+
+# Yield the frames of a frames file as surfaces
+def readFrames(fileName):
+    with open(fileName, 'rb') as frameFile:
+        fileMagic, fileVersion, width, height = header.unpack(
+            frameFile.read(header.size))
+        if fileMagic != magic or fileVersion != version:
+            raise ValueError('not an asteroids frames file')
+        while True:
+            length = frameFile.read(frameLength.size)
+            if not length:
+                break
+            data = frameFile.read(frameLength.unpack(length)[0])
+            yield pygame.image.frombytes(zlib.decompress(data), (width, height), 'RGB')
+
+
+if __name__ == "__main__":
+    os.makedirs(sys.argv[2], exist_ok=True)
+    count = 0
+    for image in readFrames(sys.argv[1]):
+        pygame.image.save(image, os.path.join(
+            sys.argv[2], 'frame%06d.png' % count))
+        count += 1
+    print('%d frames written to %s' % (count, sys.argv[2]))
@@ -0,0 +1,89 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+# How long a key press takes to reach the screen.
+#
+# pygame doesn't say when a key went down, only when the game reads it, so
+# every KEYDOWN gets two times: when it was read and when the read before
+# that happened. The key went down somewhere between the two. Once a flip
+# shows the tick that read it, the time from each of them to the flip is
+# kept, the first is the least the latency can have been and the second the
+# most.
+#
+# The simulation may read keys on one thread and flip on another, pending
+# keys are kept in a deque that one appends to and the other takes from.
+
+import time
+from collections import deque
+from pygame.locals import *
+from profiler import percentile
+
+
+class LatencyMeter:
+
+    historyLength = 1000  # key presses kept for the percentiles
+
+    def __init__(self):
+        self.lastRead = time.perf_counter()
+        self.pending = deque()  # (previous read, read) for keys not yet shown
+        self.fromRead = deque(maxlen=self.historyLength)
+        self.fromPreviousRead = deque(maxlen=self.historyLength)
+        self.keys = 0
+
+    # Called with the events a tick reads
+    def read(self, events):
+        now = time.perf_counter()
+        previous = self.lastRead
+        self.lastRead = now
+        for event in events:
+            if event.type == KEYDOWN:
+                self.pending.append((previous, now))
+
+    # Called straight after a flip. Keys read up to shownUntil (the end of
+    # the last tick drawn, now if not given) are on the screen
+    def flipped(self, shownUntil=None):
+        now = time.perf_counter()
+        if shownUntil is None:
+            shownUntil = now
+        while self.pending and self.pending[0][1] <= shownUntil:
+            previous, read = self.pending.popleft()
+            self.fromRead.append((now - read) * 1000.0)
+            self.fromPreviousRead.append((now - previous) * 1000.0)
+            self.keys += 1
+
+    def report(self):
+        if not self.fromRead:
+            return 'latency no keys yet'
+        fromRead = sorted(self.fromRead)
+        fromPreviousRead = sorted(self.fromPreviousRead)
+        return ('latency %d keys, p50 %.1f-%.1f ms, p95 %.1f-%.1f ms, p99 %.1f-%.1f ms' %
+                (self.keys,
+                 percentile(fromRead, 50), percentile(fromPreviousRead, 50),
+                 percentile(fromRead, 95), percentile(fromPreviousRead, 95),
+                 percentile(fromRead, 99), percentile(fromPreviousRead, 99)))
+
+
+# Wait until the perf_counter time deadline. time.sleep can wake a
+# millisecond or more late, so it only sleeps until spinTime before the
+# deadline and spins for the rest
+def waitUntil(deadline, spinTime=0.002):
+    remaining = deadline - time.perf_counter()
+    if remaining > spinTime:
+        time.sleep(remaining - spinTime)
+    while time.perf_counter() < deadline:
+        pass
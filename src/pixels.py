@@ -0,0 +1,104 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+# Pixel observations of a stage for agents that learn from the screen.
+#
+# PixelRenderer draws the sprites of a stage onto its own offscreen surface,
+# at any size and in greyscale. The surface is 8 bits a pixel with a grey
+# palette, so the palette index of a pixel is its brightness and the frame
+# is a uint8 NumPy view of the surface from pygame.surfarray, nothing is
+# copied. It only needs a surface, so it works with SDL's dummy video driver.
+#
+# FrameStack keeps the last few frames in a ring buffer. Each frame is
+# written twice, depth apart, so the last depth frames are always a
+# contiguous slice, oldest first, that can be handed out without copying.
+
+import numpy
+import pygame
+
+
+class PixelRenderer:
+
+    # dimensions is the (width, height) of the frame, the stage is scaled
+    # to fit it
+    def __init__(self, stage, dimensions=(128, 96)):
+        self.stage = stage
+        self.width, self.height = dimensions
+        self.scaleX = self.width / stage.width
+        self.scaleY = self.height / stage.height
+        self.surface = pygame.Surface(dimensions, depth=8)
+        self.surface.set_palette([(i, i, i) for i in range(256)])
+        self.background = self.grey(stage.backgroundColor)
+
+        # surfarray is (x, y), the transpose makes it (row, column) like
+        # any other image, both are views of the surface's own pixels
+        self.frame = pygame.surfarray.pixels2d(self.surface).T
+
+    @staticmethod
+    def grey(color):
+        r, g, b = color[:3]
+        return (r * 299 + g * 587 + b * 114) // 1000
+
+    # Draw the sprites where they are now, the HUD text is left out
+    def render(self):
+        surface = self.surface
+        scaleX = self.scaleX
+        scaleY = self.scaleY
+        sprites = list(self.stage.sprites)
+        if self.stage.transformer is not None:
+            self.stage.transformer.transform(sprites)
+
+        surface.fill(self.background)
+        for sprite in sprites:
+            pointlist = [(x * scaleX, y * scaleY) for x, y in sprite.draw()]
+            brightness = self.grey(sprite.color)
+            pygame.draw.lines(surface, (brightness, brightness, brightness),
+                              True, pointlist)
+        if self.stage.particles is not None:
+            self.stage.particles.draw(surface, 1.0, scaleX, scaleY, 1)
+        return self.frame
+
+
+class FrameStack:
+
+    def __init__(self, renderer, depth=4):
+        self.renderer = renderer
+        self.depth = depth
+        self.frames = numpy.zeros(
+            (depth * 2, renderer.height, renderer.width), dtype=numpy.uint8)
+        self.next = 0
+
+    # Fill the stack with the current frame, e.g. at the start of a game
+    def reset(self):
+        frame = self.renderer.render()
+        self.frames[:] = frame
+        self.next = 0
+        return self.stacked()
+
+    # Render a frame and add it to the stack
+    def push(self):
+        frame = self.renderer.render()
+        self.frames[self.next] = frame
+        self.frames[self.next + self.depth] = frame
+        self.next = (self.next + 1) % self.depth
+        return self.stacked()
+
+    # The last depth frames oldest first, it is a view so it only holds
+    # them until the next push
+    def stacked(self):
+        return self.frames[self.next:self.next + self.depth]
@@ -0,0 +1,164 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+import time
+import pygame
+from collections import deque
+from fontManager import *
+
+# Per frame profiler shown with the FPS counter (J key).
+#
+# The game calls mark(section) after each phase of the frame, the time since
+# the previous mark is added to that section. A frame may run several game
+# ticks, their times are added together. endFrame() is called once the frame
+# is on the screen.
+#
+# The text is drawn into a surface of the profiler's own each time the rows
+# change, rather than through the shared text cache where fifty or so
+# changing numbers would push the HUD text out.
+#
+# While the overlay is off the game holds a NullProfiler whose methods do
+# nothing, so the only cost is a few empty calls a frame.
+
+
+class NullProfiler:
+
+    def mark(self, section):
+        pass
+
+    def endFrame(self, stage):
+        pass
+
+    def draw(self, stage, x, y):
+        pass
+
+
+class FrameProfiler:
+
+    sections = ('wait', 'input', 'moveSprites', 'updateBounds', 'doSaucerLogic',
+                'checkCollisions', 'rewind', 'drawSprites', 'hud', 'flip')
+    historyLength = 240  # frames kept for the percentiles and graph
+    refreshFrames = 10  # how often the text is updated
+    textColor = (255, 255, 255)
+    graphColor = (0, 255, 0)
+    budgetColor = (255, 0, 0)
+    fontSize = 15
+    lineHeight = 16
+    columnWidths = (110, 50, 50, 50, 50)
+    graphHeight = 60
+
+    def __init__(self, frameRate=60, historyLength=None):
+        if historyLength is not None:
+            self.historyLength = historyLength
+        self.budget = 1000.0 / frameRate  # ms a frame can take
+        self.last = time.perf_counter()
+        self.times = dict.fromkeys(self.sections, 0.0)
+        self.history = {}
+        for section in self.sections:
+            self.history[section] = deque(maxlen=self.historyLength)
+        self.frameTimes = deque(maxlen=self.historyLength)
+        self.frameCount = 0
+        self.rows = []
+        self.text = None  # the rows drawn out, made again when they change
+
+    def mark(self, section):
+        now = time.perf_counter()
+        self.times[section] += now - self.last
+        self.last = now
+
+    def endFrame(self, stage):
+        frameTime = 0.0
+        for section in self.sections:
+            self.history[section].append(self.times[section] * 1000.0)
+            frameTime += self.times[section]
+            self.times[section] = 0.0
+        self.frameTimes.append(frameTime * 1000.0)
+
+        self.frameCount += 1
+        if self.frameCount % self.refreshFrames == 1:
+            self.rows = self.report(stage)
+            self.text = self.renderRows(self.rows)
+
+    # Rows of text cells for the overlay, times are in ms
+    def report(self, stage):
+        rows = [('ms', 'last', 'p50', 'p95', 'p99')]
+        for section in self.sections + ('frame',):
+            if section == 'frame':
+                samples = self.frameTimes
+            else:
+                samples = self.history[section]
+            ordered = sorted(samples)
+            rows.append((section, '%.2f' % samples[-1],
+                         '%.2f' % percentile(ordered, 50),
+                         '%.2f' % percentile(ordered, 95),
+                         '%.2f' % percentile(ordered, 99)))
+
+        counts = {}
+        for sprite in stage.sprites:
+            name = type(sprite).__name__
+            counts[name] = counts.get(name, 0) + 1
+        if stage.particles is not None:
+            counts['Particle'] = stage.particles.count
+        rows.append((' '.join('%s %d' % (name, counts[name])
+                              for name in sorted(counts)),))
+        return rows
+
+    # One surface with the rows of text in their columns
+    def renderRows(self, rows):
+        font = getFont(self.fontSize, None)
+        cells = []
+        width = 0
+        for rowNumber, row in enumerate(rows):
+            cellX = 0
+            for cell, cellWidth in zip(row, self.columnWidths):
+                surface = font.render(cell, True, self.textColor)
+                cells.append((surface, (cellX, rowNumber * self.lineHeight)))
+                width = max(width, cellX + surface.get_width())
+                cellX += cellWidth
+        text = pygame.Surface((width, len(rows) * self.lineHeight), pygame.SRCALPHA)
+        text.blits(cells)
+        return text
+
+    # Draw the text and a graph of the recent frame times, the red line is
+    # the time a frame has at the target frame rate
+    def draw(self, stage, x, y):
+        if self.text is not None:
+            stage.blit(self.text, (x, y))
+            y += self.text.get_height()
+
+        if len(self.frameTimes) < 2:
+            return
+
+        width = self.historyLength
+        scale = self.graphHeight / (self.budget * 2)
+        graph = pygame.Surface((width, self.graphHeight))
+        budgetY = self.graphHeight - 1 - int(self.budget * scale)
+        pygame.draw.line(graph, self.budgetColor, (0, budgetY), (width, budgetY))
+        points = [(i, self.graphHeight - 1 - min(self.graphHeight - 1, int(t * scale)))
+                  for i, t in enumerate(self.frameTimes)]
+        pygame.draw.lines(graph, self.graphColor, False, points)
+        stage.blit(graph, (x, y + 4))
+
+
+def percentile(ordered, percent):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
+
+
+nullProfiler = NullProfiler()
@@ -0,0 +1,71 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+# Hand frames from the simulation thread to the render thread.
+#
+# After each tick the simulation builds a RenderSnapshot, everything needed
+# to draw the frame, and publishes it. Nothing in a snapshot is changed once
+# it is published (the transformed point lists are replaced, never changed,
+# when sprites move), so the render thread can draw it while the simulation
+# carries on with the next tick.
+#
+# RenderBuffer holds two snapshots, the one being shown and the newest. The
+# simulation writes the newest into the back slot and swaps it to the front,
+# the render thread takes whatever is at the front. Neither waits for the
+# other for more than the swap.
+
+import threading
+import time
+
+
+class RenderSnapshot:
+
+    # polygons are (pointlist, color, headingX, headingY) for each sprite
+    # in drawing order, particles is a copy of the ParticleSystem or None.
+    # The HUD text comes ready made so the render thread never reads the game
+    def __init__(self, polygons, particles, scoreText, gameState, paused,
+                 rewindReport=None):
+        self.polygons = polygons
+        self.particles = particles
+        self.scoreText = scoreText
+        self.gameState = gameState
+        self.paused = paused
+        self.rewindReport = rewindReport
+        self.time = time.perf_counter()  # when it was published
+
+
+class RenderBuffer:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshots = [None, None]
+        self.front = 0
+        self.published = 0
+
+    # Called by the simulation thread
+    def publish(self, snapshot):
+        back = 1 - self.front
+        self.snapshots[back] = snapshot
+        with self.lock:
+            self.front = back
+            self.published += 1
+
+    # Called by the render thread, None until the first publish
+    def latest(self):
+        with self.lock:
+            return self.snapshots[self.front]
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+# Record the controls of a game and play them back.
+#
+# All the randomness in a game comes from its seed, so the seed and the
+# control word of every tick are all it takes to play a game again exactly.
+#
+# File format, all little endian:-
+#     4 bytes  'ASTR'
+#     1 byte   format version
+#     8 bytes  seed
+#     then runs of (count, control word), 1 byte each, count 1 to 255
+#
+# Usage: python3 replay.py game.rec
+
+import struct
+import sys
+import time
+
+magic = b'ASTR'
+version = 1
+header = struct.Struct('<4sBQ')
+
+
+class Recording:
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.runs = []  # [count, control word] pairs
+
+    def record(self, controls):
+        if self.runs and self.runs[-1][1] == controls and self.runs[-1][0] < 255:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, controls])
+
+    def ticks(self):
+        return sum(count for count, controls in self.runs)
+
+    def toBytes(self):
+        data = bytearray(header.pack(magic, version, self.seed))
+        for count, controls in self.runs:
+            data.append(count)
+            data.append(controls)
+        return bytes(data)
+
+    @staticmethod
+    def fromBytes(data):
+        if len(data) < header.size or (len(data) - header.size) % 2:
+            raise ValueError('truncated asteroids recording')
+        fileMagic, fileVersion, seed = header.unpack_from(data)
+        if fileMagic != magic or fileVersion != version:
+            raise ValueError('not an asteroids recording')
+        recording = Recording(seed)
+        for i in range(header.size, len(data), 2):
+            recording.runs.append([data[i], data[i + 1]])
+        return recording
+
+    def save(self, fileName):
+        with open(fileName, 'wb') as f:
+            f.write(self.toBytes())
+
+    @staticmethod
+    def load(fileName):
+        with open(fileName, 'rb') as f:
+            return Recording.fromBytes(f.read())
+
+
+# Hands a game the recorded control words in place of the keyboard
+class ReplayControls:
+
+    def __init__(self, recording):
+        self.words = [controls for count, controls in recording.runs
+                      for _ in range(count)]
+        self.position = 0
+
+    def finished(self):
+        return self.position >= len(self.words)
+
+    def read(self, events, keys):
+        if self.finished():
+            return 0
+        controls = self.words[self.position]
+        self.position += 1
+        return controls
+
+
+# Play a recording back headless, as fast as possible
+def replayGame(recording):
+    from asteroids import Asteroids
+    from controls import noKeys
+
+    game = Asteroids(headless=True, seed=recording.seed)
+    game.controls = ReplayControls(recording)
+    # Nothing from the keyboard, the recording is the only input
+    while not game.controls.finished():
+        game.tick((), noKeys)
+    return game
+
+
+if __name__ == "__main__":
+    recording = Recording.load(sys.argv[1])
+    start = time.perf_counter()
+    game = replayGame(recording)
+    seconds = time.perf_counter() - start
+    ticks = recording.ticks()
+    print('%d ticks in %.2fs (%d ticks/s), score %d, lives %d' %
+          (ticks, seconds, ticks / seconds, game.score, game.lives))
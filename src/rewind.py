@@ -0,0 +1,109 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+# The last few seconds of a game, so it can be run backwards.
+#
+# The game is snapshotted after every tick. Snapshots are kept in groups: the
+# first of a group is a keyframe, stored whole, and the rest are deltas, the
+# snapshot XORed with the keyframe. Most of a snapshot doesn't change from
+# one tick to the next, so a delta is mostly zero bytes and zlib squeezes it
+# down to a fraction of the size. Whole groups drop off the front once the
+# buffer holds more than the given number of seconds, so memory stays
+# bounded however many sprites there are.
+
+import time
+import zlib
+from collections import deque
+
+
+class RewindBuffer:
+
+    keyframeInterval = 30  # ticks from one keyframe to the next
+    compression = 1
+
+    def __init__(self, seconds=10, tickRate=60):
+        self.tickRate = tickRate
+        self.maxGroups = (seconds * tickRate) // self.keyframeInterval + 1
+        self.groups = deque()  # each [compressed keyframe, deltas, size in bytes]
+        self.keyframe = None  # the newest group's keyframe, uncompressed
+        self.captures = 0
+        self.captureTime = 0.0
+
+    # Snapshot the game at the end of a tick
+    def capture(self, game):
+        start = time.perf_counter()
+        data = game.snapshot()
+
+        if not self.groups or len(self.groups[-1][1]) + 1 >= self.keyframeInterval:
+            keyframe = zlib.compress(data, self.compression)
+            self.groups.append([keyframe, [], len(keyframe)])
+            self.keyframe = data
+            if len(self.groups) > self.maxGroups:
+                self.groups.popleft()
+        else:
+            group = self.groups[-1]
+            delta = zlib.compress(xorBytes(data, self.keyframe), self.compression)
+            group[1].append((len(data), delta))
+            group[2] += len(delta)
+
+        self.captures += 1
+        self.captureTime += time.perf_counter() - start
+
+    # Put the game back one tick. The newest snapshot is the game as it is,
+    # so it is thrown away and the one before it restored. Returns False
+    # once the buffer has run out
+    def stepBack(self, game):
+        if self.ticks() < 2:
+            return False
+
+        group = self.groups[-1]
+        if group[1]:
+            length, delta = group[1].pop()
+            group[2] -= len(delta)
+        else:
+            self.groups.pop()
+            group = self.groups[-1]
+            self.keyframe = zlib.decompress(group[0])
+
+        if group[1]:
+            length, delta = group[1][-1]
+            data = xorBytes(zlib.decompress(delta), self.keyframe)[:length]
+        else:
+            data = self.keyframe
+        game.restore(data)
+        return True
+
+    def ticks(self):
+        return sum(len(group[1]) + 1 for group in self.groups)
+
+    def size(self):
+        return sum(group[2] for group in self.groups)
+
+    def report(self):
+        ticks = self.ticks()
+        seconds = ticks / self.tickRate
+        perSecond = self.size() / seconds if seconds else 0
+        captureCost = self.captureTime / self.captures * 1e6 if self.captures else 0
+        return ('rewind %.1fs, %d KB per second, %d us a capture' %
+                (seconds, perSecond / 1024, captureCost))
+
+
+# XOR two byte strings, the shorter one is padded with zeros
+def xorBytes(a, b):
+    length = max(len(a), len(b))
+    return (int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')).to_bytes(length, 'little')
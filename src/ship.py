@@ -33,6 +33,7 @@ class Ship(Shooter):
     bulletVelocity = 13.0
     maxBullets = 4
     bulletTtl = 35
+    pointlist = [(0, -10), (6, 10), (3, 7), (-3, 7), (-6, 10)]
 
     def __init__(self, stage):
 
@@ -42,24 +43,13 @@ class Ship(Shooter):
         self.shipDebrisList = []
         self.visible = True
         self.inHyperSpace = False
-        pointlist = [(0, -10), (6, 10), (3, 7), (-3, 7), (-6, 10)]
+        self.hyperSpaceTtl = 0
 
-        Shooter.__init__(self, position, heading, pointlist, stage)
+        Shooter.__init__(self, position, heading, self.pointlist, stage)
 
     def draw(self):
-        if self.visible:
-            if not self.inHyperSpace:
-                VectorSprite.draw(self)
-            else:
-                self.hyperSpaceTtl -= 1
-                if self.hyperSpaceTtl == 0:
-                    self.inHyperSpace = False
-                    self.color = (255, 255, 255)
-                    self.thrustJet.color = (255, 255, 255)
-                    self.position.x = random.randrange(0, self.stage.width)
-                    self.position.y = random.randrange(0, self.stage.height)
-                    position = Vector2d(self.position.x, self.position.y)
-                    self.thrustJet.position = position
+        if self.visible and not self.inHyperSpace:
+            VectorSprite.draw(self)
 
         return self.transformedPointlist
 
@@ -73,32 +63,39 @@ class Ship(Shooter):
 
     def increaseThrust(self):
         playSoundContinuous("thrust")
-        if math.hypot(self.heading.x, self.heading.y) > self.maxVelocity:
+        if self.heading.length() > self.maxVelocity:
             return
 
         dx = self.acceleration * math.sin(radians(self.angle)) * -1
         dy = self.acceleration * math.cos(radians(self.angle)) * -1
-        self.changeVelocity(dx, dy)
+        self.changeVelocity(Vector2d(dx, dy))
 
     def decreaseThrust(self):
         stopSound("thrust")
         if (self.heading.x == 0 and self.heading.y == 0):
             return
 
-        dx = self.heading.x * self.decelaration
-        dy = self.heading.y * self.decelaration
-        self.changeVelocity(dx, dy)
+        self.changeVelocity(self.heading * self.decelaration)
 
-    def changeVelocity(self, dx, dy):
-        self.heading.x += dx
-        self.heading.y += dy
-        self.thrustJet.heading.x += dx
-        self.thrustJet.heading.y += dy
+    def changeVelocity(self, change):
+        self.heading += change
+        self.thrustJet.heading += change
 
+    # Hyperspace counts down in game ticks, not in frames drawn
     def move(self):
         VectorSprite.move(self)
         self.decreaseThrust()
 
+        if self.visible and self.inHyperSpace:
+            self.hyperSpaceTtl -= 1
+            if self.hyperSpaceTtl == 0:
+                self.inHyperSpace = False
+                self.color = (255, 255, 255)
+                self.thrustJet.color = (255, 255, 255)
+                self.position.x = self.stage.random.randrange(0, self.stage.width)
+                self.position.y = self.stage.random.randrange(0, self.stage.height)
+                self.thrustJet.position = self.position.copy()
+
     # Break the shape of the ship down into several lines
     # Ship shape - [(0, -10), (6, 10), (3, 7), (-3, 7), (-6, 10)]
     def explode(self):
@@ -117,8 +114,7 @@ class Ship(Shooter):
 
     def addShipDebris(self, pointlist):
         heading = Vector2d(0, 0)
-        position = Vector2d(self.position.x, self.position.y)
-        debris = VectorSprite(position, heading, pointlist, self.angle)
+        debris = VectorSprite(self.position.copy(), heading, pointlist, self.angle)
 
         # Add debris to the stage
         self.stage.addSprite(debris)
@@ -129,9 +125,9 @@ class Ship(Shooter):
 
         # Alter the random values below to change the rate of expansion
         debris.heading.x = ((centerX - self.position.x) +
-                            0.1) / random.uniform(20, 40)
+                            0.1) / self.stage.random.uniform(20, 40)
         debris.heading.y = ((centerY - self.position.y) +
-                            0.1) / random.uniform(20, 40)
+                            0.1) / self.stage.random.uniform(20, 40)
         self.shipDebrisList.append(debris)
 
     # Set the bullet velocity and create the bullet
@@ -156,6 +152,7 @@ class Ship(Shooter):
 
 # Exhaust jet when ship is accelerating
 class ThrustJet(VectorSprite):
+    layer = 'ships'
     pointlist = [(-3, 7), (0, 13), (3, 7)]
 
     def __init__(self, stage, ship):
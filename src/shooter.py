@@ -18,11 +18,14 @@
 
 import random
 from util.vectorsprites import *
+from util.pool import *
 from util import *
 
 
 class Shooter(VectorSprite):
 
+    layer = 'ships'
+
     def __init__(self, position, heading, pointlist, stage):
         VectorSprite.__init__(self, position, heading, pointlist)
         self.bullets = []
@@ -30,17 +33,21 @@ class Shooter(VectorSprite):
 
     def fireBullet(self, heading, ttl, velocity):
         if (len(self.bullets) < self.maxBullets):
-            position = Vector2d(self.position.x, self.position.y)
-            newBullet = Bullet(position, heading, self,
-                               ttl, velocity, self.stage)
-            self.bullets.append(newBullet)
-            self.stage.addSprite(newBullet)
+            bullet = self.stage.pool(newBullet).acquire(
+                self.stage, self.position.x, self.position.y, heading, self, ttl, velocity)
+            self.bullets.append(bullet)
+            self.stage.addSprite(bullet)
             return True
 
-    def bulletCollision(self, target):
+    # bullets narrows the search down, e.g. to the bullets a SpatialHash
+    # found near the target, only this shooter's bullets in it are checked
+    def bulletCollision(self, target, bullets=None):
+        if bullets is None:
+            bullets = self.bullets
+
         collisionDetected = False
-        for bullet in self.bullets:
-            if bullet.ttl > 0 and target.collidesWith(bullet):
+        for bullet in bullets:
+            if bullet.shooter is self and bullet.ttl > 0 and target.collidesWith(bullet):
                 collisionDetected = True
                 bullet.ttl = 0
 
@@ -51,13 +58,26 @@ class Shooter(VectorSprite):
 
 class Bullet(Point):
 
+    layer = 'bullets'
+
     def __init__(self, position, heading, shooter, ttl, velocity, stage):
         Point.__init__(self, position, heading, stage)
         self.shooter = shooter
         self.ttl = ttl
         self.velocity = velocity
 
+    def reset(self, stage, x, y, heading, shooter, ttl, velocity):
+        Point.reset(self, stage, x, y, heading.x, heading.y)
+        self.shooter = shooter
+        self.ttl = ttl
+        self.velocity = velocity
+
     def move(self):
         Point.move(self)
         if (self.ttl <= 0):
             self.shooter.bullets.remove(self)
+
+
+def newBullet(stage, x, y, heading, shooter, ttl, velocity):
+    return Bullet(Vector2d(x, y), heading, shooter, ttl, velocity, stage)
+
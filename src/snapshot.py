@@ -0,0 +1,355 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+# Save the whole state of a game as bytes and put it back.
+#
+# A game restored from a snapshot plays on exactly as the game it was taken
+# from would have, given the same controls. Snapshots are taken between
+# ticks. Bounding rects and transformed points are worked out again from
+# the positions, everything else is saved.
+#
+# Every sprite the game can reach is saved once and given a number, whether
+# it is on the stage or not (a saucer keeps aiming at a ship that has been
+# destroyed, bullets outlive the saucer that fired them). References between
+# sprites (bullet to shooter, ship to thrust jet and back, saucer to ship)
+# are saved as these numbers, -1 for none.
+#
+# Format, all little endian:-
+#     game       the game fields (see gameFields)
+#     random     the 625 words of the Mersenne Twister state, then whether
+#                there is a spare gauss value and the value
+#     sprites    a count, then for each sprite the common fields (see
+#                spriteFields) followed by the fields for its kind
+#     lists      rockList and livesList, then the sprites in each stage
+#                layer, each a count and then sprite numbers
+#     particles  a count, then the x, y, vx, vy, ttl and brightness arrays
+
+import struct
+
+from util.vectorsprites import *
+from badies import *
+from ship import *
+from shooter import *
+from soundManager import *
+
+magic = b'ASTS'
+version = 2
+gameStates = ('attract_mode', 'playing', 'exploding')
+
+gameFields = struct.Struct('<4sBBqiqiiqi??BBii')
+randomFields = struct.Struct('<625I?d')
+spriteFields = struct.Struct('<Bdddddd?hhhi')
+rockFields = struct.Struct('<BB')
+shipFields = struct.Struct('<??ii')
+thrustJetFields = struct.Struct('<?i')
+saucerFields = struct.Struct('<Bidi')
+bulletFields = struct.Struct('<di')
+count = struct.Struct('<I')
+point = struct.Struct('<hh')
+
+# Sprite kinds, only exact classes are saved
+rockKind = 1
+shipKind = 2
+thrustJetKind = 3
+saucerKind = 4
+bulletKind = 5
+debrisKind = 6
+vectorSpriteKind = 7
+kinds = {Rock: rockKind, Ship: shipKind, ThrustJet: thrustJetKind,
+         Saucer: saucerKind, Bullet: bulletKind, Debris: debrisKind,
+         VectorSprite: vectorSpriteKind}
+
+
+# Number every sprite the game can reach, in a fixed order
+def numberSprites(game):
+    numbers = {}
+    sprites = []
+
+    def visit(sprite):
+        if sprite is None or sprite in numbers:
+            return
+        numbers[sprite] = len(sprites)
+        sprites.append(sprite)
+        kind = kinds[type(sprite)]
+        if kind == shipKind:
+            visit(sprite.thrustJet)
+            for other in sprite.bullets:
+                visit(other)
+            for other in sprite.shipDebrisList:
+                visit(other)
+        elif kind == thrustJetKind:
+            visit(sprite.ship)
+        elif kind == saucerKind:
+            visit(sprite.ship)
+            for other in sprite.bullets:
+                visit(other)
+        elif kind == bulletKind:
+            visit(sprite.shooter)
+
+    for sprite in game.stage.sprites:
+        visit(sprite)
+    visit(game.ship)
+    visit(game.saucer)
+    for sprite in game.rockList:
+        visit(sprite)
+    for sprite in game.livesList:
+        visit(sprite)
+    return numbers, sprites
+
+
+def packList(numbers, sprites):
+    return count.pack(len(sprites)) + \
+        struct.pack('<%di' % len(sprites), *[numbers[sprite] for sprite in sprites])
+
+
+def unpackIndexes(data, offset):
+    length = count.unpack_from(data, offset)[0]
+    offset += count.size
+    return struct.unpack_from('<%di' % length, data, offset), offset + 4 * length
+
+
+def unpackList(data, offset, sprites):
+    indexes, offset = unpackIndexes(data, offset)
+    return [sprites[i] for i in indexes], offset
+
+
+def takeSnapshot(game):
+    numbers, sprites = numberSprites(game)
+
+    def number(sprite):
+        if sprite is None:
+            return -1
+        return numbers[sprite]
+
+    parts = [gameFields.pack(
+        magic, version, gameStates.index(game.gameState),
+        game.score, game.lives, game.nextLife, game.numRocks,
+        game.startLives, game.secondsCount, game.explodingCount,
+        game.paused, game.frameAdvance, game.controlWord,
+        game.stage.rockShape, number(game.ship), number(game.saucer))]
+
+    randomVersion, words, gauss = game.random.getstate()
+    parts.append(randomFields.pack(*words, gauss is not None, gauss or 0.0))
+
+    parts.append(count.pack(len(sprites)))
+    for sprite in sprites:
+        kind = kinds[type(sprite)]
+        r, g, b = sprite.color
+        parts.append(spriteFields.pack(
+            kind, sprite.position.x, sprite.position.y,
+            sprite.heading.x, sprite.heading.y, sprite.angle, sprite.vAngle,
+            type(sprite.angle) is int, r, g, b, sprite.ttl))
+
+        if kind == rockKind:
+            parts.append(rockFields.pack(sprite.rockType, sprite.shape))
+        elif kind == shipKind:
+            parts.append(shipFields.pack(
+                sprite.visible, sprite.inHyperSpace, sprite.hyperSpaceTtl,
+                number(sprite.thrustJet)))
+            parts.append(packList(numbers, sprite.bullets))
+            parts.append(packList(numbers, sprite.shipDebrisList))
+        elif kind == thrustJetKind:
+            parts.append(thrustJetFields.pack(
+                sprite.accelerating, number(sprite.ship)))
+        elif kind == saucerKind:
+            parts.append(saucerFields.pack(
+                sprite.saucerType, sprite.laps, sprite.lastx,
+                number(sprite.ship)))
+            parts.append(packList(numbers, sprite.bullets))
+        elif kind == bulletKind:
+            parts.append(bulletFields.pack(
+                sprite.velocity, number(sprite.shooter)))
+        elif kind == vectorSpriteKind:
+            parts.append(count.pack(len(sprite.pointlist)))
+            for x, y in sprite.pointlist:
+                parts.append(point.pack(x, y))
+
+    parts.append(packList(numbers, game.rockList))
+    parts.append(packList(numbers, game.livesList))
+    for layer in game.stage.layers:
+        parts.append(packList(numbers, game.stage.sprites.layers[layer]))
+    if game.stage.particles is not None:
+        parts.append(game.stage.particles.toBytes())
+    else:
+        parts.append(count.pack(0))
+    return b''.join(parts)
+
+
+# Replace the state of the game with the snapshot
+def restoreSnapshot(game, data):
+    stage = game.stage
+    (fileMagic, fileVersion, gameState, score, lives, nextLife, numRocks,
+     startLives, secondsCount, explodingCount, paused, frameAdvance,
+     controlWord, rockShape, shipNumber, saucerNumber) = gameFields.unpack_from(data)
+    if fileMagic != magic or fileVersion != version:
+        raise ValueError('not an asteroids snapshot')
+    offset = gameFields.size
+
+    randomState = randomFields.unpack_from(data, offset)
+    offset += randomFields.size
+
+    # Clear the stage, pooled sprites go back to their pools to be reused
+    for sprite in list(stage.sprites):
+        stage.removeSprite(sprite)
+
+    # Make the sprites, references are filled in once they all exist
+    spriteCount = count.unpack_from(data, offset)[0]
+    offset += count.size
+    sprites = []
+    links = []
+    for _ in range(spriteCount):
+        (kind, x, y, headingX, headingY, angle, vAngle, angleIsInt,
+         r, g, b, ttl) = spriteFields.unpack_from(data, offset)
+        offset += spriteFields.size
+        position = Vector2d(x, y)
+        heading = Vector2d(headingX, headingY)
+
+        if kind == rockKind:
+            rockType, shape = rockFields.unpack_from(data, offset)
+            offset += rockFields.size
+            sprite = Rock.__new__(Rock)
+            sprite.stage = stage
+            sprite.rockType = rockType
+            sprite.shape = shape
+            pointlist = [sprite.scale(point, Rock.scales[rockType])
+                         for point in Rock.shapes[shape - 1]]
+            VectorSprite.__init__(sprite, position, heading, pointlist)
+        elif kind == shipKind:
+            visible, inHyperSpace, hyperSpaceTtl, thrustJet = \
+                shipFields.unpack_from(data, offset)
+            offset += shipFields.size
+            bullets, offset = unpackIndexes(data, offset)
+            debris, offset = unpackIndexes(data, offset)
+            sprite = Ship.__new__(Ship)
+            Shooter.__init__(sprite, position, heading, Ship.pointlist, stage)
+            sprite.visible = visible
+            sprite.inHyperSpace = inHyperSpace
+            sprite.hyperSpaceTtl = hyperSpaceTtl
+            links.append((sprite, thrustJet, bullets, debris))
+        elif kind == thrustJetKind:
+            accelerating, ship = thrustJetFields.unpack_from(data, offset)
+            offset += thrustJetFields.size
+            sprite = ThrustJet.__new__(ThrustJet)
+            VectorSprite.__init__(sprite, position, heading, ThrustJet.pointlist)
+            sprite.accelerating = accelerating
+            links.append((sprite, ship))
+        elif kind == saucerKind:
+            saucerType, laps, lastx, ship = saucerFields.unpack_from(data, offset)
+            offset += saucerFields.size
+            bullets, offset = unpackIndexes(data, offset)
+            sprite = Saucer.__new__(Saucer)
+            pointlist = [sprite.scale(point, Saucer.scales[saucerType])
+                         for point in Saucer.pointlist]
+            Shooter.__init__(sprite, position, heading, pointlist, stage)
+            sprite.saucerType = saucerType
+            sprite.scoreValue = Saucer.scores[saucerType]
+            sprite.laps = laps
+            sprite.lastx = lastx
+            links.append((sprite, ship, bullets))
+        elif kind == bulletKind:
+            velocity, shooter = bulletFields.unpack_from(data, offset)
+            offset += bulletFields.size
+            sprite = stage.pool(newBullet).acquire(stage, x, y, heading, None, ttl, velocity)
+            links.append((sprite, shooter))
+        elif kind == debrisKind:
+            sprite = stage.pool(newDebris).acquire(stage, x, y)
+            sprite.heading.x = headingX
+            sprite.heading.y = headingY
+        else:
+            length = count.unpack_from(data, offset)[0]
+            offset += count.size
+            pointlist = [point.unpack_from(data, offset + i * point.size)
+                         for i in range(length)]
+            offset += length * point.size
+            sprite = VectorSprite(position, heading, pointlist)
+
+        if angleIsInt:
+            sprite.angle = int(angle)
+            sprite.vAngle = int(vAngle)
+        else:
+            sprite.angle = angle
+            sprite.vAngle = vAngle
+        sprite.color = (r, g, b)
+        sprite.ttl = ttl
+        sprites.append(sprite)
+
+    def find(number):
+        if number < 0:
+            return None
+        return sprites[number]
+
+    for link in links:
+        sprite = link[0]
+        kind = kinds[type(sprite)]
+        if kind == shipKind:
+            sprite.thrustJet = find(link[1])
+            sprite.bullets = [sprites[i] for i in link[2]]
+            sprite.shipDebrisList = [sprites[i] for i in link[3]]
+        elif kind == thrustJetKind:
+            sprite.ship = find(link[1])
+        elif kind == saucerKind:
+            sprite.ship = find(link[1])
+            sprite.bullets = [sprites[i] for i in link[2]]
+        elif kind == bulletKind:
+            sprite.shooter = find(link[1])
+
+    # Sprites off the stage get their points and bounding rect too
+    for sprite in sprites:
+        sprite.rotateAndTransform()
+        sprite.updateBoundingRect()
+
+    game.rockList, offset = unpackList(data, offset, sprites)
+    game.livesList, offset = unpackList(data, offset, sprites)
+    for layer in stage.layers:
+        layerSprites, offset = unpackList(data, offset, sprites)
+        for sprite in layerSprites:
+            stage.sprites.add(sprite, layer)
+    if stage.particles is not None:
+        offset = stage.particles.loadBytes(data, offset)
+    stage.redrawAll = True
+
+    game.gameState = gameStates[gameState]
+    game.score = score
+    game.lives = lives
+    game.nextLife = nextLife
+    game.numRocks = numRocks
+    game.startLives = startLives
+    game.secondsCount = secondsCount
+    game.explodingCount = explodingCount
+    game.paused = paused
+    game.frameAdvance = frameAdvance
+    game.controlWord = controlWord
+    game.ship = find(shipNumber)
+    game.saucer = find(saucerNumber)
+    stage.rockShape = rockShape
+
+    # Last of all as making the pooled sprites used random numbers
+    words = randomState[:625]
+    gauss = randomState[626] if randomState[625] else None
+    game.random.setstate((3, words, gauss))
+
+    # Only the sounds of the restored game should be playing
+    stopSound("thrust")
+    stopSound("lsaucer")
+    stopSound("ssaucer")
+    if game.saucer is not None:
+        if game.saucer.saucerType == Saucer.largeSaucerType:
+            playSoundContinuous("lsaucer")
+        else:
+            playSoundContinuous("ssaucer")
+
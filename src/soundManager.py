@@ -38,13 +38,18 @@ def initSoundManager():
     sounds["extralife"] = pygame.mixer.Sound("../res/LIFE.WAV")
 
 
+# Sounds are skipped until initSoundManager has loaded them, so a game
+# can run without the mixer (e.g. headless)
 def playSound(soundName):
-    channel = sounds[soundName].play()
+    if soundName in sounds:
+        channel = sounds[soundName].play()
 
 
 def playSoundContinuous(soundName):
-    channel = sounds[soundName].play(-1)
+    if soundName in sounds:
+        channel = sounds[soundName].play(-1)
 
 
 def stopSound(soundName):
-    channel = sounds[soundName].stop()
+    if soundName in sounds:
+        channel = sounds[soundName].stop()
@@ -19,50 +19,253 @@
 import pygame
 import sys
 import os
+import random
 from pygame.locals import *
+from util.transform import *
+from util.particles import *
+from util.spritecache import *
+from util.spriteregistry import *
+from util.pool import *
 
 
 class Stage:
 
+    backgroundColor = (10, 10, 10)
+
+    # Sprite layers in the order they are moved and drawn
+    layers = ('rocks', 'ships', 'bullets', 'debris', 'hud')
+
     # Set up the PyGame surface
-    def __init__(self, caption, dimensions=None):
+    # A headless stage draws to an offscreen surface and never opens a window
+    # With dirtyRects only the parts of the screen that changed are erased
+    # and sent to the display each frame
+    # With spriteCache sprites are drawn from pre-drawn surfaces (needs NumPy)
+    def __init__(self, caption, dimensions=None, headless=False, dirtyRects=False,
+                 spriteCache=False):
+        self.headless = headless
+        self.dirtyRects = dirtyRects
+        if headless:
+            # SDL's dummy drivers let pygame start on boxes without a display
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
         pygame.init()
 
-        # If no screen size is provided pick the first available mode
-        if dimensions == None:
-            dimensions = pygame.display.list_modes()[0]
+        if headless:
+            if dimensions == None:
+                dimensions = (1024, 768)
+            self.screen = pygame.Surface(dimensions)
+        else:
+            # If no screen size is provided pick the first available mode
+            if dimensions == None:
+                dimensions = pygame.display.list_modes()[0]
+
+            pygame.display.set_mode(dimensions, FULLSCREEN)
+            pygame.mouse.set_visible(False)
 
-        pygame.display.set_mode(dimensions, FULLSCREEN)
-        pygame.mouse.set_visible(False)
+            # pygame.display.set_mode(dimensions)
 
-        # pygame.display.set_mode(dimensions)
+            pygame.display.set_caption(caption)
+            self.screen = pygame.display.get_surface()
 
-        pygame.display.set_caption(caption)
-        self.screen = pygame.display.get_surface()
-        self.spriteList = []
+        self.sprites = SpriteRegistry(self.layers, self.releaseSprite)
+        self.pools = {}  # a SpritePool for each factory, see pool()
+
+        # Game state the sprites share, all their random numbers come from
+        # here so a seeded game can be played again exactly
+        self.random = random.Random()
+        self.rockShape = 1  # the next rock shape to be generated
         self.width = dimensions[0]
         self.height = dimensions[1]
         self.showBoundingBoxes = False
 
-    # Add sprite to list then draw it as a easy way to get the bounding rect
-    def addSprite(self, sprite):
-        self.spriteList.append(sprite)
-        sprite.boundingRect = pygame.draw.aalines(
-            self.screen, sprite.color, True, sprite.draw())
+        # Dirty rectangles, drawnRects are still on the screen and need
+        # erasing, updateRects have changed since the display was updated
+        self.drawnRects = []
+        self.updateRects = []
+        self.redrawAll = True
+
+        # Rotate all the sprites in one go when NumPy is available, and
+        # keep explosion debris in arrays rather than as sprites
+        if numpy is not None:
+            self.transformer = BatchTransformer()
+            self.particles = ParticleSystem()
+        else:
+            self.transformer = None
+            self.particles = None
+
+        if spriteCache and numpy is not None:
+            self.spriteCache = SpriteSurfaceCache()
+        else:
+            self.spriteCache = None
 
+    # Add sprite to its layer and work out its bounding rect from its points,
+    # it is not drawn until drawSprites
+    # The layer comes from the sprite's class unless one is given
+    def addSprite(self, sprite, layer=None):
+        if layer is None:
+            layer = sprite.layer
+        self.sprites.add(sprite, layer)
+        sprite.transformed = False
+        sprite.rotateAndTransform()
+        sprite.updateBoundingRect()
+
+    # Sprites removed while moveSprites or drawSprites is running stay on
+    # the stage until it has finished
     def removeSprite(self, sprite):
-        self.spriteList.remove(sprite)
+        self.sprites.remove(sprite)
+
+    # The stage's pool of sprites made by factory. Each stage has its own so
+    # the sprites of a game that is thrown away go with it
+    def pool(self, factory):
+        pool = self.pools.get(factory)
+        if pool is None:
+            pool = SpritePool(factory)
+            self.pools[factory] = pool
+        return pool
+
+    # Pooled sprites go back to their pool to be reused once they are gone
+    def releaseSprite(self, sprite):
+        if sprite.pool is not None:
+            sprite.pool.release(sprite)
+
+    # Transform every sprite to its current position and work out its
+    # bounding rect from the points, nothing is drawn
+    def updateBounds(self):
+        sprites = list(self.sprites)
+        if self.transformer is not None:
+            self.transformer.transform(sprites)
+        else:
+            for sprite in sprites:
+                sprite.rotateAndTransform()
+
+        for sprite in sprites:
+            sprite.updateBoundingRect()
+
+    # alpha below 1 draws each sprite part way back towards where it was
+    # on the previous tick, to smooth out frames that fall between ticks.
+    # Drawing leaves the bounding rects from updateBounds alone
+    # With the sprite cache, sprites with whole degree angles are collected
+    # up and blitted together with Surface.blits
+    def drawSprites(self, alpha=1.0):
+        sprites = list(self.sprites)
+        if self.transformer is not None and self.spriteCache is None:
+            self.transformer.transform(sprites)
 
-    def drawSprites(self):
-        for sprite in self.spriteList:
-            sprite.boundingRect = pygame.draw.aalines(
-                self.screen, sprite.color, True, sprite.draw())
+        blits = []
+        for sprite in sprites:
+            pointlist = sprite.draw()
+            dx = dy = 0.0
+            if alpha != 1.0:
+                dx = (alpha - 1.0) * sprite.heading.x
+                dy = (alpha - 1.0) * sprite.heading.y
+
+            if self.spriteCache is not None and type(sprite.angle) is int:
+                surface, offsetX, offsetY = self.spriteCache.get(sprite)
+                blits.append((surface,
+                              (round(sprite.position.x + dx) + offsetX,
+                               round(sprite.position.y + dy) + offsetY)))
+                if self.showBoundingBoxes == True:
+                    self.blitSprites(blits)
+                    pygame.draw.rect(self.screen, (255, 255, 255),
+                                     sprite.boundingRect, 1)
+                    if self.dirtyRects:
+                        self.addDirtyRect(sprite.boundingRect)
+                continue
+
+            # Anything else is drawn on top of what is waiting to be blitted
+            self.blitSprites(blits)
+            if alpha != 1.0:
+                pointlist = [[x + dx, y + dy] for x, y in pointlist]
+            drawnRect = pygame.draw.aalines(
+                self.screen, sprite.color, True, pointlist)
             if self.showBoundingBoxes == True:
                 pygame.draw.rect(self.screen, (255, 255, 255),
                                  sprite.boundingRect, 1)
+                drawnRect = drawnRect.union(sprite.boundingRect)
+            if self.dirtyRects:
+                self.addDirtyRect(drawnRect)
+        self.blitSprites(blits)
+
+        if self.particles is not None:
+            self.drawParticles(self.particles, alpha)
+
+    # Every sprite as it would be drawn now, as (pointlist, color, headingX,
+    # headingY) for drawPolygons. The point lists are the sprites' own, they
+    # are replaced rather than changed when the sprites next move
+    def spritePolygons(self):
+        sprites = list(self.sprites)
+        if self.transformer is not None:
+            self.transformer.transform(sprites)
+        return [(sprite.draw(), sprite.color, sprite.heading.x, sprite.heading.y)
+                for sprite in sprites]
+
+    # Draw polygons from spritePolygons, alpha as in drawSprites
+    def drawPolygons(self, polygons, alpha=1.0):
+        for pointlist, color, headingX, headingY in polygons:
+            if alpha != 1.0:
+                dx = (alpha - 1.0) * headingX
+                dy = (alpha - 1.0) * headingY
+                pointlist = [[x + dx, y + dy] for x, y in pointlist]
+            drawnRect = pygame.draw.aalines(self.screen, color, True, pointlist)
+            if self.dirtyRects:
+                self.addDirtyRect(drawnRect)
+
+    def drawParticles(self, particles, alpha=1.0):
+        drawnRects = particles.draw(self.screen, alpha)
+        if self.dirtyRects:
+            for rect in drawnRects:
+                self.addDirtyRect(rect)
+
+    # Blit the (surface, position) pairs in one call and empty the list
+    def blitSprites(self, blits):
+        if not blits:
+            return
+        rects = self.screen.blits(blits)
+        if self.dirtyRects:
+            for rect in rects:
+                self.addDirtyRect(rect)
+        del blits[:]
+
+    # Draw a surface (e.g. HUD text) onto the screen
+    def blit(self, surface, rect):
+        rect = self.screen.blit(surface, rect)
+        if self.dirtyRects and rect.inflate(2, 2) not in self.drawnRects:
+            self.addDirtyRect(rect)
+
+    # Remember an area that has been drawn on, grown a pixel each way to
+    # cover the antialiasing
+    def addDirtyRect(self, rect):
+        rect = rect.inflate(2, 2)
+        self.drawnRects.append(rect)
+        self.updateRects.append(rect)
+
+    # Wipe the last frame, either the whole screen or just what was drawn
+    # (the first frame, and any after redrawAll is set, wipe everything).
+    # Wiped areas have changed too, so they are sent to the display
+    def clear(self):
+        if self.dirtyRects and not self.redrawAll:
+            for rect in self.drawnRects:
+                self.screen.fill(self.backgroundColor, rect)
+                self.updateRects.append(rect)
+        else:
+            self.screen.fill(self.backgroundColor)
+            self.updateRects = [self.screen.get_rect()]
+            self.redrawAll = False
+        self.drawnRects = []
+
+    # Show the finished frame, there is nothing to show when headless
+    def flip(self):
+        if self.headless:
+            self.updateRects = []
+        elif self.dirtyRects:
+            pygame.display.update(self.updateRects)
+            self.updateRects = []
+        else:
+            pygame.display.flip()
 
     def moveSprites(self):
-        for sprite in self.spriteList:
+        for sprite in self.sprites:
             sprite.move()
 
             if sprite.position.x < 0:
@@ -76,3 +279,6 @@ class Stage:
 
             if sprite.position.y > self.height:
                 sprite.position.y = 0
+
+        if self.particles is not None:
+            self.particles.update(self.width, self.height)
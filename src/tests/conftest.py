@@ -0,0 +1,45 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+# The game's modules import each other from src, and the tests run on
+# SDL's dummy drivers so they need no display or sound card
+
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Makes seeded headless games, started unless started is False, playing
+# with the given controls if there are any
+@pytest.fixture
+def newGame():
+    from asteroids import Asteroids
+
+    def newGame(seed=1, controls=None, started=True):
+        game = Asteroids(headless=True, seed=seed)
+        if controls is not None:
+            game.controls = controls
+        if started:
+            game.initialiseGame()
+        return game
+    return newGame
@@ -0,0 +1,34 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+
+import pygame
+from pygame.locals import *
+
+from environment import *
+
+
+# Keys and window events meant for someone else never reach the game
+def test_step_ignores_pygame_input():
+    env = AsteroidsEnv(maxTicks=100)
+    env.reset(seed=3)
+    pygame.event.post(pygame.event.Event(KEYDOWN, key=K_ESCAPE))
+    pygame.event.post(pygame.event.Event(QUIT))
+    for _ in range(5):
+        env.step(0)
+    assert len(pygame.event.get()) >= 2
@@ -0,0 +1,49 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+
+import pygame
+import pytest
+
+from framerecorder import *
+
+
+def test_frames_file_round_trip(tmp_path):
+    path = str(tmp_path / 'game.frames')
+    recorder = FrameRecorder(path)
+    surfaces = []
+    for shade in range(0, 250, 50):
+        surface = pygame.Surface((16, 8))
+        surface.fill((shade, 255 - shade, 7))
+        surfaces.append(surface)
+        recorder.capture(surface)
+    recorder.close()
+    assert recorder.written == recorder.captured == len(surfaces)
+
+    frames = list(readFrames(path))
+    assert [pygame.image.tobytes(frame, 'RGB') for frame in frames] == \
+        [pygame.image.tobytes(surface, 'RGB') for surface in surfaces]
+
+
+# A writer that fails doesn't hang close(), which raises its error
+def test_close_raises_the_writer_error(tmp_path):
+    recorder = FrameRecorder(str(tmp_path / 'missing' / 'game.frames'), maxQueue=2)
+    for _ in range(5):
+        recorder.capture(pygame.Surface((4, 4)))
+    with pytest.raises(OSError):
+        recorder.close()
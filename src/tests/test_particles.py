@@ -0,0 +1,42 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+
+import random
+
+import pygame
+
+from util.particles import *
+
+
+# Bursts at opposite corners are reported as small areas round each one,
+# between them covering every pixel drawn
+def test_draw_reports_small_rects_round_each_burst():
+    particles = ParticleSystem()
+    particles.emit(20, 20, 25, random.Random(1))
+    particles.emit(1000, 740, 25, random.Random(2))
+    for _ in range(10):
+        particles.update(1024, 768)
+
+    surface = pygame.Surface((1024, 768))
+    rects = particles.draw(surface)
+    assert sum(rect.width * rect.height for rect in rects) < 1024 * 768 // 20
+
+    pixels = pygame.surfarray.array3d(surface).any(axis=2)
+    for x, y in zip(*pixels.nonzero()):
+        assert any(rect.collidepoint(x, y) for rect in rects)
@@ -0,0 +1,82 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+
+from asteroids import *
+from util.spriteregistry import *
+
+
+def bulletsOnStage(game):
+    return sum(1 for sprite in game.stage.sprites if isinstance(sprite, Bullet))
+
+
+class Counter:
+
+    def __init__(self, value):
+        self.value = value
+
+    def reset(self, value):
+        self.value = value
+
+
+def test_released_sprites_are_reused():
+    pool = SpritePool(Counter)
+    first = pool.acquire(1)
+    pool.release(first)
+    assert pool.acquire(2) is first
+    assert first.value == 2
+    assert pool.size() == 1
+    assert pool.inUse == 1
+    assert pool.highWater == 1
+
+
+def test_each_stage_has_its_own_pools(newGame):
+    game = newGame()
+    other = newGame()
+    game.ship.fireBullet()
+    assert game.stage.pool(newBullet) is not other.stage.pool(newBullet)
+    assert game.stage.pool(newBullet).inUse == 1
+    assert other.stage.pool(newBullet).inUse == 0
+
+
+def test_pool_counts_stay_right_through_restore(newGame):
+    game = newGame()
+    game.ship.maxBullets = 20
+    for _ in range(5):
+        game.ship.fireBullet()
+    data = game.snapshot()
+    for _ in range(5):
+        game.ship.fireBullet()
+        game.tick([])
+    game.restore(data)
+    assert game.stage.pool(newBullet).inUse == bulletsOnStage(game) == 5
+
+
+def test_registry_defers_removal_while_walking():
+    removed = []
+    registry = SpriteRegistry(('a', 'b'), removed.append)
+    registry.add('x', 'a')
+    registry.add('y', 'b')
+    seen = []
+    for sprite in registry:
+        seen.append(sprite)
+        registry.remove('y')
+        assert len(registry) == 1
+    assert seen == ['x']
+    assert removed == ['y']
+    assert 'y' not in registry
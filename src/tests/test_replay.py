@@ -0,0 +1,42 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+
+import pytest
+
+from asteroids import *
+from replay import *
+
+
+def test_truncated_recordings_are_rejected():
+    recording = Recording(5)
+    recording.record(FIRE)
+    recording.record(LEFT)
+    data = recording.toBytes()
+    assert Recording.fromBytes(data).runs == recording.runs
+    with pytest.raises(ValueError):
+        Recording.fromBytes(data[:-1])
+    with pytest.raises(ValueError):
+        Recording.fromBytes(data[:5])
+
+
+# Any seed can be recorded, negative ones included
+def test_negative_seeds_can_be_recorded():
+    game = Asteroids(headless=True, seed=-7)
+    recording = Recording(game.seed)
+    assert Recording.fromBytes(recording.toBytes()).seed == game.seed
@@ -0,0 +1,87 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+
+import random
+
+from asteroids import *
+from replay import *
+from rewind import *
+
+
+# Random controls, from their own seeded random numbers
+class RandomControls:
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+
+    def read(self, events, keys):
+        controls = self.random.choice([0, LEFT, RIGHT, THRUST, THRUST | LEFT])
+        if self.random.random() < 0.2:
+            controls |= FIRE
+        if self.random.random() < 0.005:
+            controls |= HYPERSPACE
+        return controls | START
+
+
+def randomGame(newGame, seed):
+    return newGame(seed, RandomControls(seed), started=False)
+
+
+def test_replay_reproduces_the_same_state(newGame):
+    game = randomGame(newGame, 11)
+    game.recording = Recording(game.seed)
+    for _ in range(1500):
+        game.tick([])
+
+    replayed = replayGame(Recording.fromBytes(game.recording.toBytes()))
+    assert replayed.snapshot() == game.snapshot()
+
+
+def test_restored_game_carries_on_the_same(newGame):
+    game = randomGame(newGame, 12)
+    for _ in range(600):
+        game.tick([])
+    data = game.snapshot()
+    controlsState = game.controls.random.getstate()
+    for _ in range(600):
+        game.tick([])
+
+    other = randomGame(newGame, 99)
+    other.restore(data)
+    assert other.snapshot() == data
+    other.controls.random.setstate(controlsState)
+    for _ in range(600):
+        other.tick([])
+    assert other.snapshot() == game.snapshot()
+
+
+def test_rewind_steps_back_through_earlier_snapshots(newGame):
+    game = randomGame(newGame, 13)
+    game.rewind = RewindBuffer(seconds=2, tickRate=60)
+    snapshots = []
+    for _ in range(200):
+        game.tick([])
+        snapshots.append(game.snapshot())
+
+    ticks = game.rewind.ticks()
+    assert 120 <= ticks < 200
+    for back in range(1, ticks):
+        assert game.rewind.stepBack(game)
+        assert game.snapshot() == snapshots[-1 - back]
+    assert not game.rewind.stepBack(game)
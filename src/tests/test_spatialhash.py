@@ -0,0 +1,39 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+
+import pygame
+
+from util.spatialhash import *
+
+
+def test_query_finds_nearby_items_once():
+    grid = SpatialHash(256, 256, cellSize=64)
+    grid.insert('big', pygame.Rect(10, 10, 120, 120))  # four cells
+    grid.insert('small', pygame.Rect(70, 70, 4, 4))
+    grid.insert('far', pygame.Rect(200, 10, 4, 4))
+    found = grid.query(pygame.Rect(60, 60, 20, 20))
+    assert sorted(found) == ['big', 'small']
+    assert grid.query(pygame.Rect(60, 60, 20, 20)) == found
+
+
+def test_query_wraps_round_the_edges():
+    grid = SpatialHash(256, 256, cellSize=64)
+    grid.insert('corner', pygame.Rect(250, 250, 4, 4))
+    assert grid.query(pygame.Rect(-10, -10, 12, 12)) == ['corner']
+    assert grid.query(pygame.Rect(100, 100, 4, 4)) == []
@@ -0,0 +1,48 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+
+import pygame
+
+from stage import *
+from util.vectorsprites import *
+
+
+# Every area drawn on one frame and wiped on the next has to be sent to the
+# display, or the sprite leaves a trail behind it
+def test_dirty_rects_update_wiped_areas(monkeypatch):
+    updated = []
+    monkeypatch.setattr(pygame.display, 'update', lambda rects: updated.append(list(rects)))
+    stage = Stage('test', (200, 200), dirtyRects=True)
+
+    sprite = VectorSprite(Vector2d(50, 50), Vector2d(20, 0),
+                          [(-5, -5), (5, -5), (5, 5), (-5, 5)])
+    stage.addSprite(sprite)
+    for frame in range(3):
+        stage.clear()
+        stage.drawSprites()
+        drawn = list(stage.drawnRects)
+        stage.flip()
+        stage.moveSprites()
+        stage.updateBounds()
+
+        stage.clear()
+        stage.drawSprites()
+        stage.flip()
+        for rect in drawn:
+            assert any(update.contains(rect) for update in updated[-1])
@@ -0,0 +1,63 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+
+import threading
+import time
+
+import pygame
+import pytest
+
+from asteroids import *
+
+
+# The simulation thread never touches pygame's keyboard state itself, the
+# main thread reads it and passes it over with the events
+def test_keyboard_is_only_read_on_the_main_thread(monkeypatch):
+    readers = set()
+    getPressed = pygame.key.get_pressed
+
+    def recordingGetPressed():
+        readers.add(threading.current_thread())
+        return getPressed()
+    monkeypatch.setattr(pygame.key, 'get_pressed', recordingGetPressed)
+
+    game = Asteroids(frameRate=60, seed=4)
+
+    def stop():
+        time.sleep(0.3)
+        game.running = False
+    threading.Thread(target=stop).start()
+    game.playThreaded()
+
+    assert game.secondsCount > 1
+    assert game.renderBuffer.published > 1
+    assert readers == {threading.main_thread()}
+
+
+# An error on the simulation thread stops the game and is raised again on
+# the main thread
+def test_simulation_errors_are_raised():
+    game = Asteroids(frameRate=60, seed=4)
+
+    def failingTick(events=None, keys=None):
+        raise ValueError('simulation failed')
+    game.tick = failingTick
+    with pytest.raises(ValueError):
+        game.playThreaded()
+    assert not game.running
@@ -0,0 +1,56 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+
+import numpy
+
+from environment import *
+from vectorenv import *
+
+
+# Games stepped in worker processes, auto reset included, come out the
+# same as the same games stepped one at a time
+def test_matches_games_stepped_one_at_a_time():
+    numEnvs = 3
+    steps = 400
+    actions = numpy.random.default_rng(0).integers(0, len(actionWords), (steps, numEnvs))
+
+    envs = VectorEnv(numEnvs, numWorkers=2, maxTicks=150)
+    try:
+        envs.reset(seed=10)
+        rewards = numpy.zeros(numEnvs)
+        for stepActions in actions:
+            observation, reward, terminated, truncated = envs.step(stepActions)
+            rewards += reward
+        ships = observation['ship'].copy()
+    finally:
+        envs.close()
+
+    env = AsteroidsEnv(maxTicks=150)
+    for i in range(numEnvs):
+        observation, info = env.reset(10 + i)
+        episodes = 0
+        total = 0.0
+        for action in actions[:, i]:
+            observation, reward, terminated, truncated, info = env.step(action)
+            total += reward
+            if terminated or truncated:
+                episodes += 1
+                observation, info = env.reset(10 + i + episodes * numEnvs)
+        assert total == rewards[i]
+        assert (observation['ship'] == ships[i]).all()
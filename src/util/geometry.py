@@ -16,8 +16,6 @@
 #    Copyright (C) 2018  Francisco Sanchez Arroyo
 #
 
-from pygame import Rect
-
 #    Geometry functions to find intersecting lines.
 #    Thes calc's use this formula for a straight line:-
 #        y = mx + b where m is the gradient and b is the y value when x=0
@@ -104,61 +102,111 @@ def getIntersectPoint(p1, p2, p3, p4):
 # For line segments (ie not infinitely long lines) the intersect point
 # may not lay on both lines.
 #
-# If the point where two lines intersect is inside both line's bounding
-# rectangles then the lines intersect. Returns intersect point if the line
-# intesect o None if not
+# Each segment is written as a start point plus a fraction (0 to 1) of its
+# direction vector, p1 + t * (p2 - p1) and p3 + u * (p4 - p3), and t and u are
+# found with cross products. The lines intersect if both t and u are between
+# 0 and 1. This needs no gradients, so vertical lines are not a special case,
+# and no division until a hit has been found. Returns the intersect point if
+# the lines intersect or None if not
 
 
 def calculateIntersectPoint(p1, p2, p3, p4):
+    rx = p2[0] - p1[0]
+    ry = p2[1] - p1[1]
+    sx = p4[0] - p3[0]
+    sy = p4[1] - p3[1]
+    qx = p3[0] - p1[0]
+    qy = p3[1] - p1[1]
+
+    denom = rx * sy - ry * sx
+    if denom != 0:
+        t = qx * sy - qy * sx
+        u = qx * ry - qy * rx
+
+        # 0 <= t / denom <= 1 and 0 <= u / denom <= 1 without the divisions
+        if denom > 0:
+            if t < 0 or t > denom or u < 0 or u > denom:
+                return None
+        elif t > 0 or t < denom or u > 0 or u < denom:
+            return None
 
-    p = getIntersectPoint(p1, p2, p3, p4)
-
-    if p is not None:
-        width = p2[0] - p1[0]
-        height = p2[1] - p1[1]
-        r1 = Rect(p1, (width, height))
-        r1.normalize()
-
-        width = p4[0] - p3[0]
-        height = p4[1] - p3[1]
-        r2 = Rect(p3, (width, height))
-        r2.normalize()
-
-        # Ensure both rects have a width and height of at least 'tolerance' else the
-        # collidepoint check of the Rect class will fail as it doesn't include the bottom
-        # and right hand side 'pixels' of the rectangle
-        tolerance = 1
-        if r1.width < tolerance:
-            r1.width = tolerance
-
-        if r1.height < tolerance:
-            r1.height = tolerance
-
-        if r2.width < tolerance:
-            r2.width = tolerance
-
-        if r2.height < tolerance:
-            r2.height = tolerance
-
-        for point in p:
-            try:
-                res1 = r1.collidepoint(point)
-                res2 = r2.collidepoint(point)
-                if res1 and res2:
-                    point = [int(pp) for pp in point]
-                    return point
-            except:
-                # sometimes the value in a point are too large for PyGame's Rect class
-                str = "point was invalid  ", point
-                print(str)
-
-        # This is the case where the infinately long lines crossed but
-        # the line segments didn't
-        return None
+        t = t / denom
+        return [int(p1[0] + t * rx), int(p1[1] + t * ry)]
 
-    else:
+    # Parallel lines only touch if they lay on one another. A zero length
+    # segment is a point, it is parallel to everything so it has to be on
+    # the other segment's line, and two points have to be the same point
+    if rx == 0 and ry == 0:
+        if sx == 0 and sy == 0:
+            if p1[0] == p3[0] and p1[1] == p3[1]:
+                return [int(p1[0]), int(p1[1])]
+            return None
+        if qx * sy - qy * sx != 0:
+            return None
+    elif qx * ry - qy * rx != 0:
         return None
 
+    # in which case return the first end point that is on both segments
+    for point in (p1, p2, p3, p4):
+        if onCollinearSegment(point, p1, p2) and onCollinearSegment(point, p3, p4):
+            return [int(point[0]), int(point[1])]
+
+    return None
+
+# True if point p, which is known to be on the same line as the segment
+# p1 to p2, lays between p1 and p2
+
+
+def onCollinearSegment(p, p1, p2):
+    return (min(p1[0], p2[0]) <= p[0] <= max(p1[0], p2[0]) and
+            min(p1[1], p2[1]) <= p[1] <= max(p1[1], p2[1]))
+
+# Check every edge of the closed polygon pointlist1 against every edge of the
+# closed polygon pointlist2. The edges are checked in the same order as
+# VectorSprite.checkPolygonCollision always has and the first intersect point
+# found is returned, or None if the outlines don't cross.
+#
+# The non parallel case of calculateIntersectPoint is inlined here and the
+# edges of the second polygon are only worked out once.
+
+
+def calculatePolygonIntersectPoint(pointlist1, pointlist2):
+    edges = []
+    for j in range(0, len(pointlist2)):
+        p3 = pointlist2[j-1]
+        p4 = pointlist2[j]
+        edges.append((p3[0], p3[1], p4[0] - p3[0], p4[1] - p3[1], p3, p4))
+
+    for i in range(0, len(pointlist1)):
+        p1 = pointlist1[i-1]
+        p2 = pointlist1[i]
+        x1 = p1[0]
+        y1 = p1[1]
+        rx = p2[0] - x1
+        ry = p2[1] - y1
+        for x3, y3, sx, sy, p3, p4 in edges:
+            denom = rx * sy - ry * sx
+            if denom == 0:
+                p = calculateIntersectPoint(p1, p2, p3, p4)
+                if p is not None:
+                    return p
+                continue
+
+            qx = x3 - x1
+            qy = y3 - y1
+            t = qx * sy - qy * sx
+            u = qx * ry - qy * rx
+            if denom > 0:
+                if t < 0 or t > denom or u < 0 or u > denom:
+                    continue
+            elif t > 0 or t < denom or u > 0 or u < denom:
+                continue
+
+            t = t / denom
+            return [int(x1 + t * rx), int(y1 + t * ry)]
+
+    return None
+
 
 # Test script below...
 if __name__ == "__main__":
@@ -204,4 +252,38 @@ if __name__ == "__main__":
     assert None != calculateIntersectPoint(
         p9, p10, p7, p8), "line 5 line 4 should intersect"
 
+    # collinear lines that overlap and ones that don't
+    assert None != calculateIntersectPoint(
+        (0, 0), (4, 4), (2, 2), (6, 6)), "overlapping collinear lines should intersect"
+    assert None == calculateIntersectPoint(
+        (0, 0), (1, 1), (2, 2), (6, 6)), "separate collinear lines shouldn't intersect"
+    assert None != calculateIntersectPoint(
+        p11, p12, (500.0, 116.0), (600.0, 116.0)), "overlapping horizontal lines should intersect"
+
+    # zero length segments are points
+    assert None == calculateIntersectPoint(
+        (5, 1), (5, 1), (0, 0), (10, 10)), "point off line 6 shouldn't intersect"
+    assert None == calculateIntersectPoint(
+        (0, 0), (10, 10), (5, 1), (5, 1)), "line 6 point off it shouldn't intersect"
+    assert [5, 5] == calculateIntersectPoint(
+        (5, 5), (5, 5), (0, 0), (10, 10)), "point on line 6 should intersect"
+    assert None == calculateIntersectPoint(
+        (12, 12), (12, 12), (0, 0), (10, 10)), "point past line 6 shouldn't intersect"
+    assert [2, 3] == calculateIntersectPoint(
+        (2, 3), (2, 3), (2, 3), (2, 3)), "same points should intersect"
+    assert None == calculateIntersectPoint(
+        (2, 3), (2, 3), (2, 4), (2, 4)), "different points shouldn't intersect"
+    assert None == calculatePolygonIntersectPoint(
+        [(5, 1), (5, 1), (6, 0)], [(0, 0), (10, 10), (0, 10)]), \
+        "polygon with a repeated point off the other shouldn't intersect"
+
+    # whole polygons
+    square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+    triangle = [(5, 5), (15, 5), (15, 15)]
+    farTriangle = [(50, 50), (60, 50), (60, 60)]
+    assert None != calculatePolygonIntersectPoint(
+        square, triangle), "square and triangle should intersect"
+    assert None == calculatePolygonIntersectPoint(
+        square, farTriangle), "square and far triangle shouldn't intersect"
+
     print("\nSUCCESS! All asserts passed for doLinesIntersect")
@@ -0,0 +1,198 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+import struct
+
+import pygame
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#    Explosion debris as plain arrays rather than one sprite per particle.
+#
+#    Each particle is a position, a velocity, a ttl and a brightness, kept in
+#    one NumPy array per field with the live particles packed at the front.
+#    A tick moves, fades and wraps all of them in a handful of array sums and
+#    drops the dead ones. They are drawn by writing pixels straight into the
+#    surface through pygame.surfarray, not with a draw call each.
+#
+#    Particles behave like the Debris sprites they replace: a random heading
+#    from the stage's random numbers, 50 ticks to live, fading by 5 a tick.
+
+
+class ParticleSystem:
+
+    lifetime = 50  # ticks
+    startBrightness = 255
+    fade = 5
+    speed = 1.5
+    size = 2  # particles are size x size pixels on the screen
+    cellSize = 64  # the screen squares draw() reports as drawn over
+    header = struct.Struct('<I')
+
+    def __init__(self, capacity=1024):
+        self.count = 0
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        old = self.count
+        x = numpy.zeros(capacity)
+        y = numpy.zeros(capacity)
+        vx = numpy.zeros(capacity)
+        vy = numpy.zeros(capacity)
+        ttl = numpy.zeros(capacity, dtype=numpy.int32)
+        brightness = numpy.zeros(capacity, dtype=numpy.int32)
+        if old:
+            x[:old] = self.x[:old]
+            y[:old] = self.y[:old]
+            vx[:old] = self.vx[:old]
+            vy[:old] = self.vy[:old]
+            ttl[:old] = self.ttl[:old]
+            brightness[:old] = self.brightness[:old]
+        self.x, self.y, self.vx, self.vy = x, y, vx, vy
+        self.ttl, self.brightness = ttl, brightness
+
+    # Add count particles at x, y heading off in random directions
+    def emit(self, x, y, count, random):
+        if self.count + count > len(self.x):
+            self.allocate(max(len(self.x) * 2, self.count + count))
+
+        start = self.count
+        end = start + count
+        self.x[start:end] = x
+        self.y[start:end] = y
+        for i in range(start, end):
+            self.vx[i] = random.uniform(-self.speed, self.speed)
+            self.vy[i] = random.uniform(-self.speed, self.speed)
+        self.ttl[start:end] = self.lifetime
+        self.brightness[start:end] = self.startBrightness
+        self.count = end
+
+    # Move, fade and wrap the particles then drop the ones that have expired
+    def update(self, width, height):
+        count = self.count
+        if count == 0:
+            return
+
+        x = self.x[:count]
+        y = self.y[:count]
+        ttl = self.ttl[:count]
+        ttl -= 1
+        x += self.vx[:count]
+        y += self.vy[:count]
+        self.brightness[:count] -= self.fade
+        x[x < 0] = width
+        x[x > width] = 0
+        y[y < 0] = height
+        y[y > height] = 0
+
+        alive = ttl > 0
+        remaining = int(numpy.count_nonzero(alive))
+        if remaining < count:
+            for field in (self.x, self.y, self.vx, self.vy, self.ttl, self.brightness):
+                field[:remaining] = field[:count][alive]
+            self.count = remaining
+
+    # Write the particles into the surface, alpha as in Stage.drawSprites.
+    # An 8 bit surface is taken to have a grey palette, the brightness is
+    # the palette index. Returns the rects drawn over, one for each
+    # cellSize square with particles in, so explosions far apart don't
+    # make one rect covering the screen between them
+    def draw(self, surface, alpha=1.0, scaleX=1.0, scaleY=1.0, size=None):
+        count = self.count
+        if count == 0:
+            return []
+        if size is None:
+            size = self.size
+
+        x = self.x[:count]
+        y = self.y[:count]
+        if alpha != 1.0:
+            x = x + (alpha - 1.0) * self.vx[:count]
+            y = y + (alpha - 1.0) * self.vy[:count]
+        columns = (x * scaleX).astype(numpy.intp)
+        rows = (y * scaleY).astype(numpy.intp)
+        brightness = numpy.clip(self.brightness[:count], 0, 255)
+
+        width, height = surface.get_size()
+        if surface.get_bitsize() == 8:
+            pixels = pygame.surfarray.pixels2d(surface)
+        else:
+            pixels = pygame.surfarray.pixels3d(surface)
+            brightness = brightness[:, None]
+
+        for dx in range(size):
+            for dy in range(size):
+                xs = columns + dx
+                ys = rows + dy
+                inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+                pixels[xs[inside], ys[inside]] = brightness[inside]
+        del pixels  # unlock the surface
+
+        # A particle at the edge of a square can spill size pixels over it
+        # The squares are numbered from the one above and left of the screen
+        # so particles just off it still get a positive number
+        cellSize = self.cellSize
+        cellRows = height // cellSize + 3
+        cells = numpy.unique((columns // cellSize + 1) * cellRows + rows // cellSize + 1)
+        bounds = surface.get_rect()
+        rects = []
+        for cell in cells.tolist():
+            cellX = cell // cellRows - 1
+            cellY = cell % cellRows - 1
+            rect = pygame.Rect(cellX * cellSize, cellY * cellSize,
+                               cellSize + size, cellSize + size).clip(bounds)
+            if rect.width and rect.height:
+                rects.append(rect)
+        return rects
+
+    def clear(self):
+        self.count = 0
+
+    # A separate system holding just the live particles, to draw while
+    # this one carries on moving
+    def copy(self):
+        count = self.count
+        particles = ParticleSystem(max(count, 1))
+        for field in ('x', 'y', 'vx', 'vy', 'ttl', 'brightness'):
+            getattr(particles, field)[:count] = getattr(self, field)[:count]
+        particles.count = count
+        return particles
+
+    # The live particles as bytes, for snapshots
+    def toBytes(self):
+        count = self.count
+        return self.header.pack(count) + b''.join(
+            field[:count].tobytes() for field in
+            (self.x, self.y, self.vx, self.vy, self.ttl, self.brightness))
+
+    # Replace the particles with the ones in data, returns the offset of
+    # the end of them
+    def loadBytes(self, data, offset):
+        count = self.header.unpack_from(data, offset)[0]
+        offset += self.header.size
+        if count > len(self.x):
+            self.count = 0
+            self.allocate(count)
+        for field in (self.x, self.y, self.vx, self.vy, self.ttl, self.brightness):
+            field[:count] = numpy.frombuffer(data, field.dtype, count, offset)
+            offset += count * field.itemsize
+        self.count = count
+        return offset
@@ -0,0 +1,56 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+#    Free list of short lived sprites (bullets and debris) so they can be
+#    reused rather than created and thrown away by the hundred.
+#
+#    acquire() passes its arguments to the sprite's reset() method when there
+#    is a spare sprite, or to the factory when a new one is needed. Stage's
+#    removeSprite hands sprites back with release().
+
+
+class SpritePool:
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+        self.inUse = 0
+        self.highWater = 0  # most sprites in use at once
+
+    def acquire(self, *args):
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+        else:
+            sprite = self.factory(*args)
+            sprite.pool = self
+            self.created += 1
+
+        self.inUse += 1
+        if self.inUse > self.highWater:
+            self.highWater = self.inUse
+        return sprite
+
+    def release(self, sprite):
+        self.inUse -= 1
+        self.free.append(sprite)
+
+    # Number of sprites the pool has made, in use or spare
+    def size(self):
+        return self.created
@@ -0,0 +1,93 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+import math
+from math import *
+from collections import OrderedDict
+
+#    Pre-rotated point lists shared by every sprite.
+#
+#    There are only a handful of shapes in the game (four rocks at three scales,
+#    two saucers, the ship, its thrust jet and its debris, bullets) and rocks and
+#    ships turn in whole degrees, so the same rotated points come up over and
+#    over. Each distinct pointlist is given a small shape id and the rotated,
+#    integer points are cached against (shape id, angle mod 360), along with
+#    their extents so a bounding rect is just the extents plus the position.
+#    The least recently used entries are dropped once the cache is full.
+
+
+class RotationCache:
+
+    # 4 rock shapes * 3 scales * 360 degrees plus room for everything else
+    maxSize = 8192
+
+    def __init__(self, maxSize=None):
+        if maxSize is not None:
+            self.maxSize = maxSize
+        self.shapes = {}
+        self.points = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # Look up (or hand out) the id for a pointlist
+    def shapeId(self, pointlist):
+        shape = tuple(tuple(point) for point in pointlist)
+        shapeId = self.shapes.get(shape)
+        if shapeId is None:
+            shapeId = len(self.shapes)
+            self.shapes[shape] = shapeId
+        return shapeId
+
+    # Return the rotated points and their extents (minX, minY, maxX, maxY)
+    # for the angle. Both are shared so they are tuples and must not be changed
+    def lookup(self, shapeId, pointlist, angle):
+        key = (shapeId, angle % 360)
+        entry = self.points.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.points.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        cosVal = math.cos(radians(key[1]))
+        sinVal = math.sin(radians(key[1]))
+        rotated = tuple((int(x * cosVal + y * sinVal), int(y * cosVal - x * sinVal))
+                        for x, y in pointlist)
+        xs = [point[0] for point in rotated]
+        ys = [point[1] for point in rotated]
+        entry = (rotated, (min(xs), min(ys), max(xs), max(ys)))
+        self.points[key] = entry
+        if len(self.points) > self.maxSize:
+            self.points.popitem(last=False)
+        return entry
+
+    # Return the pointlist rotated by the angle
+    def rotate(self, shapeId, pointlist, angle):
+        return self.lookup(shapeId, pointlist, angle)[0]
+
+    # Return the extents of the pointlist rotated by the angle
+    def bounds(self, shapeId, pointlist, angle):
+        return self.lookup(shapeId, pointlist, angle)[1]
+
+    def clear(self):
+        self.points.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+rotationCache = RotationCache()
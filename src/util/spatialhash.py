@@ -0,0 +1,78 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+#    Uniform grid over the playfield used as a broad phase for collisions.
+#
+#    Sprites are filed under every cell their bounding rect touches and a query
+#    returns everything filed under the cells another rect touches. These are
+#    only candidates, the caller still has to do the real collision test.
+#    The playfield wraps round so cells off one edge map to the other side.
+#    Results come back cell by cell, in the order the cells are covered and
+#    then the order items were filed in each, so the same sprites inserted
+#    the same way always come back in the same order and collision handling
+#    stays deterministic.
+
+
+class SpatialHash:
+
+    def __init__(self, width, height, cellSize=64):
+        self.cellSize = cellSize
+        self.columns = max(1, -(-width // cellSize))
+        self.rows = max(1, -(-height // cellSize))
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    # Keys of the cells a rect covers, wrapped round the playfield edges
+    def cellKeys(self, rect):
+        left = int(rect.left) // self.cellSize
+        right = int(rect.left + max(rect.width, 1) - 1) // self.cellSize
+        top = int(rect.top) // self.cellSize
+        bottom = int(rect.top + max(rect.height, 1) - 1) // self.cellSize
+
+        # Anything wider than the playfield is in every cell anyway
+        right = min(right, left + self.columns - 1)
+        bottom = min(bottom, top + self.rows - 1)
+
+        keys = []
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                keys.append((cy % self.rows) * self.columns + cx % self.columns)
+        return keys
+
+    def insert(self, item, rect):
+        for key in self.cellKeys(rect):
+            cell = self.cells.get(key)
+            if cell is None:
+                self.cells[key] = [item]
+            else:
+                cell.append(item)
+
+    # Everything filed near the rect, each item once
+    def query(self, rect):
+        found = []
+        seen = set()
+        for key in self.cellKeys(rect):
+            cell = self.cells.get(key)
+            if cell is not None:
+                for item in cell:
+                    if item not in seen:
+                        seen.add(item)
+                        found.append(item)
+        return found
@@ -0,0 +1,95 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+from collections import OrderedDict
+
+import pygame
+
+from util.rotationcache import *
+
+#    Sprites drawn once into small surfaces and then blitted.
+#
+#    A sprite with a whole degree angle is drawn the same way every time it
+#    has the same shape, angle and colour. The first time, its rotated points
+#    (from the RotationCache) are drawn with aalines, white on black, into a
+#    surface just big enough to hold them. The result becomes the alpha
+#    channel of a surface filled with the sprite's colour. Blitting that
+#    blends the colour in by coverage, the same as aalines does, so the
+#    result matches drawing the lines to within one level per channel.
+#    Positions are rounded to the nearest pixel.
+#
+#    Angles are rounded down to a multiple of angleStep so a spinning rock
+#    needs fewer surfaces. This only changes how a sprite is drawn, its
+#    bounding rect still comes from its real angle.
+#
+#    Surfaces are dropped least recently used first once the cache holds more
+#    than maxPixels pixels.
+
+
+class SpriteSurfaceCache:
+
+    maxPixels = 8 * 1024 * 1024  # 32MB of 32 bit pixels
+    angleStep = 2  # degrees, every rock at every angle fits with 2
+
+    def __init__(self, maxPixels=None, angleStep=None):
+        if maxPixels is not None:
+            self.maxPixels = maxPixels
+        if angleStep is not None:
+            self.angleStep = angleStep
+        self.surfaces = OrderedDict()
+        self.pixels = 0
+        self.hits = 0
+        self.misses = 0
+
+    # The surface for the sprite as it is now and the offset from its
+    # rounded position to where the surface goes
+    def get(self, sprite):
+        angle = sprite.angle % 360 // self.angleStep * self.angleStep
+        key = (sprite.shapeId, angle, sprite.color)
+        entry = self.surfaces.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        rotated, (minX, minY, maxX, maxY) = rotationCache.lookup(
+            sprite.shapeId, sprite.pointlist, angle)
+        size = (maxX - minX + 3, maxY - minY + 3)
+        coverage = pygame.Surface(size)
+        pygame.draw.aalines(coverage, (255, 255, 255), True,
+                            [(x - minX + 1, y - minY + 1) for x, y in rotated])
+
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        surface.fill(tuple(sprite.color[:3]) + (0,))
+        pygame.surfarray.pixels_alpha(surface)[:] = \
+            pygame.surfarray.pixels_red(coverage)
+
+        entry = (surface, minX - 1, minY - 1)
+        self.surfaces[key] = entry
+        self.pixels += size[0] * size[1]
+        while self.pixels > self.maxPixels and len(self.surfaces) > 1:
+            oldKey, (oldSurface, offsetX, offsetY) = self.surfaces.popitem(last=False)
+            self.pixels -= oldSurface.get_width() * oldSurface.get_height()
+        return entry
+
+    def clear(self):
+        self.surfaces.clear()
+        self.pixels = 0
+        self.hits = 0
+        self.misses = 0
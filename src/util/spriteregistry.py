@@ -0,0 +1,93 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+#    The sprites on the stage, filed by layer.
+#
+#    Each layer is a dict used as an insertion ordered set, so adding and
+#    removing a sprite are O(1). Layers are walked in the order they were
+#    given, which is also the order they get drawn in.
+#
+#    Sprites can add and remove sprites (including themselves) while the
+#    registry is being walked. Removals are deferred until the walk has
+#    finished, the sprite is skipped if the walk hasn't reached it yet.
+#    Sprites added to a layer the walk hasn't reached yet are included.
+
+
+class SpriteRegistry:
+
+    def __init__(self, layerNames, onRemove=None):
+        self.layerNames = layerNames
+        self.layers = {}
+        for name in layerNames:
+            self.layers[name] = {}
+        self.layerOf = {}
+        self.onRemove = onRemove  # called with each sprite once it has gone
+        self.walking = 0
+        self.pending = {}
+
+    def add(self, sprite, layerName):
+        self.layers[layerName][sprite] = None
+        self.layerOf[sprite] = layerName
+
+    def remove(self, sprite):
+        if self.walking:
+            self.pending[sprite] = None
+        else:
+            self.discard(sprite)
+
+    def discard(self, sprite):
+        del self.layers[self.layerOf.pop(sprite)][sprite]
+        if self.onRemove is not None:
+            self.onRemove(sprite)
+
+    # Iterate over the sprites in the given layers, all of them by default
+    def walk(self, layerNames=None):
+        if layerNames is None:
+            layerNames = self.layerNames
+
+        self.walking += 1
+        try:
+            for name in layerNames:
+                for sprite in list(self.layers[name]):
+                    if sprite not in self.pending:
+                        yield sprite
+        finally:
+            self.walking -= 1
+            if not self.walking:
+                self.flush()
+
+    # Carry out the removals that were put off during a walk
+    def flush(self):
+        pending = self.pending
+        self.pending = {}
+        for sprite in pending:
+            self.discard(sprite)
+
+    def __iter__(self):
+        return self.walk()
+
+    def __contains__(self, sprite):
+        return sprite in self.layerOf and sprite not in self.pending
+
+    def __len__(self):
+        return len(self.layerOf) - len(self.pending)
+
+    # Number of sprites in one layer
+    def count(self, layerName):
+        layer = self.layers[layerName]
+        return len(layer) - sum(1 for sprite in self.pending if sprite in layer)
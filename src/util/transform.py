@@ -0,0 +1,105 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+import math
+from math import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#    Rotate and translate the pointlists of every sprite on the stage in one
+#    vectorised pass instead of one Python call per point.
+#
+#    The vertices of all the sprites are kept in two contiguous arrays (one for
+#    x, one for y) together with the index of the sprite that owns each vertex.
+#    The arrays are only rebuilt when sprites are added or removed. The
+#    extents of each sprite's points are worked out in the same pass for its
+#    bounding rect.
+#
+#    The sums are done in the same order as VectorSprite.rotateAndTransform (and
+#    the RotationCache) and the rotated points are truncated before translating,
+#    so all of them give exactly the same transformedPointlist.
+
+
+class BatchTransformer:
+
+    def __init__(self):
+        self.sprites = []
+        self.slices = []
+
+    # Collect the raw pointlists of the sprites into the vertex arrays
+    def build(self, sprites):
+        xs, ys, counts = [], [], []
+        self.slices = []
+        start = 0
+        for sprite in sprites:
+            for point in sprite.pointlist:
+                xs.append(point[0])
+                ys.append(point[1])
+            count = len(sprite.pointlist)
+            counts.append(count)
+            self.slices.append((start, start + count))
+            start += count
+
+        self.x = numpy.array(xs, dtype=float)
+        self.y = numpy.array(ys, dtype=float)
+        self.owner = numpy.repeat(numpy.arange(len(sprites)), counts)
+        self.starts = numpy.array([start for start, end in self.slices], dtype=int)
+        self.sprites = list(sprites)
+
+    # Rotate, truncate and translate all the sprites and hand each one
+    # its transformedPointlist
+    def transform(self, sprites):
+        if len(sprites) == 0:
+            return
+
+        if sprites != self.sprites:
+            self.build(sprites)
+
+        count = len(sprites)
+        # math.cos rather than numpy.cos so the result matches the per point
+        # code to the last bit
+        cosVals = numpy.fromiter(
+            (math.cos(radians(sprite.angle % 360)) for sprite in sprites), float, count)
+        sinVals = numpy.fromiter(
+            (math.sin(radians(sprite.angle % 360)) for sprite in sprites), float, count)
+        xPositions = numpy.fromiter(
+            (sprite.position.x for sprite in sprites), float, count)
+        yPositions = numpy.fromiter(
+            (sprite.position.y for sprite in sprites), float, count)
+
+        cosVals = cosVals[self.owner]
+        sinVals = sinVals[self.owner]
+        points = numpy.empty((len(self.x), 2))
+        points[:, 0] = numpy.trunc(self.x * cosVals + self.y * sinVals)
+        points[:, 1] = numpy.trunc(self.y * cosVals - self.x * sinVals)
+        points[:, 0] += xPositions[self.owner]
+        points[:, 1] += yPositions[self.owner]
+
+        # Extents of each sprite's points for its bounding rect
+        mins = numpy.minimum.reduceat(points, self.starts).tolist()
+        maxs = numpy.maximum.reduceat(points, self.starts).tolist()
+
+        # Convert a sprite at a time so each new list replaces the old one
+        # straight away, one big tolist() keeps the garbage collector busy
+        for sprite, (start, end), low, high in zip(sprites, self.slices, mins, maxs):
+            sprite.transformedPointlist = points[start:end].tolist()
+            sprite.extents = (low[0], low[1], high[0], high[1])
+            sprite.transformed = True
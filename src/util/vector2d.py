@@ -17,10 +17,57 @@
 #
 
 
+import math
+
+# Slots keep each vector down to two fields with no __dict__, there are
+# at least two of these for every sprite on the stage
+
+
 class Vector2d:
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
 
-# needs a copy constructor and method for vector addition etc
+    def copy(self):
+        return Vector2d(self.x, self.y)
+
+    def __add__(self, other):
+        return Vector2d(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        return Vector2d(self.x - other.x, self.y - other.y)
+
+    # Add another vector to this one in place, no new vector is made
+    def __iadd__(self, other):
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    # Scale by a number, vector * 2.0
+    def __mul__(self, scale):
+        return Vector2d(self.x * scale, self.y * scale)
+
+    def add(self, other):
+        return self + other
+
+    def scale(self, scale):
+        return self * scale
+
+    # sqrt rather than math.hypot, which can round differently and would
+    # throw recorded replays out
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y)
+
+    # Make this vector one unit long (a zero vector stays as it is)
+    def normalize(self):
+        length = self.length()
+        if length != 0:
+            self.x = self.x / length
+            self.y = self.y / length
+        return self
+
+    def __repr__(self):
+        return 'Vector2d(%r, %r)' % (self.x, self.y)
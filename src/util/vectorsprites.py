@@ -24,26 +24,56 @@ import random
 from math import *
 from util.vector2d import *
 from util.geometry import *
+from util.rotationcache import *
 
 
 class VectorSprite:
 
+    layer = 'debris'  # the stage layer sprites of this class go in
+
     def __init__(self, position, heading, pointlist, angle=0, color=(255, 255, 255)):
         self.position = position
         self.heading = heading
         self.angle = angle
         self.vAngle = 0
         self.pointlist = pointlist  # raw pointlist
+        self.shapeId = rotationCache.shapeId(pointlist)
         self.color = color
         self.ttl = 25
+        self.transformed = False
+        self.extents = None  # (minX, minY, maxX, maxY) of transformedPointlist
+        self.pool = None  # the SpritePool this sprite goes back to, if any
 
         #self.color = color = (random.randrange(40,255),random.randrange(40,255),random.randrange(40,255))
 
     # rotate each x,y coord by the angle, then translate it to the x,y position
+    # (same sums as rotatePoint and translatePoint but with the sin and cos
+    # worked out once per sprite rather than once per point)
     def rotateAndTransform(self):
-        newPointList = [self.rotatePoint(point) for point in self.pointlist]
+        # Skip the work if the stage's BatchTransformer has already done it
+        if self.transformed:
+            self.transformed = False
+            return
+
+        x = self.position.x
+        y = self.position.y
+
+        # Whole degree angles come pre-rotated from the shared cache, along
+        # with their extents
+        if type(self.angle) is int:
+            rotated, (minX, minY, maxX, maxY) = rotationCache.lookup(
+                self.shapeId, self.pointlist, self.angle)
+            self.transformedPointlist = [[px + x, py + y] for px, py in rotated]
+            self.extents = (minX + x, minY + y, maxX + x, maxY + y)
+            return
+
+        cosVal = math.cos(radians(self.angle % 360))
+        sinVal = math.sin(radians(self.angle % 360))
         self.transformedPointlist = [
-            self.translatePoint(point) for point in newPointList]
+            [int(px * cosVal + py * sinVal) + x,
+             int(py * cosVal - px * sinVal) + y]
+            for px, py in self.pointlist]
+        self.extents = None
 
     # draw the sprite
     def draw(self):
@@ -60,8 +90,7 @@ class VectorSprite:
     # Move the sprite by the velocity
     def move(self):
         # Apply velocity
-        self.position.x = self.position.x + self.heading.x
-        self.position.y = self.position.y + self.heading.y
+        self.position += self.heading
         self.angle = self.angle + self.vAngle
 
         # needed?
@@ -88,6 +117,22 @@ class VectorSprite:
         newPoint = [int(point) for point in newPoint]
         return newPoint
 
+    # Bounding rect of the transformed points, this matches the rect
+    # pygame.draw.aalines returns for them to within a pixel. The extents
+    # come from the transform when it knows them, nothing is drawn
+    def updateBoundingRect(self):
+        if self.extents is not None:
+            minX, minY, maxX, maxY = self.extents
+        else:
+            xs = [point[0] for point in self.transformedPointlist]
+            ys = [point[1] for point in self.transformedPointlist]
+            minX, minY, maxX, maxY = min(xs), min(ys), max(xs), max(ys)
+        left = int(floor(minX))
+        top = int(floor(minY))
+        self.boundingRect = pygame.Rect(left, top,
+                                        int(floor(maxX)) - left + 2,
+                                        int(floor(maxY)) - top + 2)
+
     def collidesWith(self, target):
         if self.boundingRect.colliderect(target.boundingRect):
             return True
@@ -97,17 +142,8 @@ class VectorSprite:
     # Check each line from pointlist1 for intersection with
     # the lines in pointlist2
     def checkPolygonCollision(self, target):
-        for i in range(0, len(self.transformedPointlist)):
-            for j in range(0, len(target.transformedPointlist)):
-                p1 = self.transformedPointlist[i-1]
-                p2 = self.transformedPointlist[i]
-                p3 = target.transformedPointlist[j-1]
-                p4 = target.transformedPointlist[j]
-                p = calculateIntersectPoint(p1, p2, p3, p4)
-                if (p != None):
-                    return p
-
-        return None
+        return calculatePolygonIntersectPoint(self.transformedPointlist,
+                                              target.transformedPointlist)
 
 # Used for bullets and debris
 
@@ -122,6 +158,18 @@ class Point(VectorSprite):
         self.stage = stage
         self.ttl = 30
 
+    # Put a pooled point back to how __init__ leaves it
+    def reset(self, stage, x, y, headingX, headingY):
+        self.stage = stage
+        self.position.x = x
+        self.position.y = y
+        self.heading.x = headingX
+        self.heading.y = headingY
+        self.angle = 0
+        self.color = (255, 255, 255)
+        self.transformed = False
+        self.ttl = 30
+
     def move(self):
         self.ttl -= 1
         if (self.ttl <= 0):
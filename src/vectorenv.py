@@ -0,0 +1,218 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#    Copyright (C) 2008  Nick Redshaw
+#    Copyright (C) 2018  Francisco Sanchez Arroyo
+#
+
+# Run many AsteroidsEnv games in parallel worker processes.
+#
+#     envs = VectorEnv(64)
+#     observations = envs.reset(seed=1)
+#     observations, rewards, terminated, truncated = envs.step(actions)
+#     envs.close()
+#
+# The games are split between the workers, one process per core by
+# default, and all of them step together. Actions, observations, rewards
+# and done flags live in shared memory as NumPy arrays with the game as
+# the first axis, so a step only sends a one byte command down each
+# worker's pipe and nothing is pickled.
+#
+# A game that finishes is reset straight away with its next seed. The
+# rewards and done flags of that step belong to the finished episode and
+# the observation is the first one of the new episode.
+#
+# Usage: python3 vectorenv.py [--envs=N] [--workers=N] [--steps=N]
+
+import multiprocessing
+import sys
+import time
+
+import numpy
+
+from environment import AsteroidsEnv
+
+# Name, shape of one game's part and dtype of each shared array
+fields = (
+    ('ship', (7,), numpy.float32),
+    ('rocks', (AsteroidsEnv.maxRocks, 5), numpy.float32),
+    ('saucer', (6,), numpy.float32),
+    ('bullets', (AsteroidsEnv.maxBullets, 5), numpy.float32),
+    ('counts', (2,), numpy.int32),
+    ('actions', (), numpy.int32),
+    ('rewards', (), numpy.float32),
+    ('terminated', (), numpy.bool_),
+    ('truncated', (), numpy.bool_),
+)
+observationNames = ('ship', 'rocks', 'saucer', 'bullets', 'counts')
+
+# Commands sent to the workers
+resetCommand = b'r'
+stepCommand = b's'
+closeCommand = b'c'
+
+
+# Allocate the shared memory for numEnvs games
+def createBuffers(numEnvs):
+    buffers = {}
+    for name, shape, dtype in fields:
+        size = numEnvs * int(numpy.prod(shape)) * numpy.dtype(dtype).itemsize
+        buffers[name] = multiprocessing.RawArray('b', max(size, 1))
+    return buffers
+
+
+# NumPy views of the shared memory, nothing is copied
+def viewBuffers(buffers, numEnvs):
+    arrays = {}
+    for name, shape, dtype in fields:
+        array = numpy.frombuffer(buffers[name], dtype=dtype,
+                                 count=numEnvs * int(numpy.prod(shape)))
+        arrays[name] = array.reshape((numEnvs,) + shape)
+    return arrays
+
+
+# Body of a worker process, hosts the games first to last - 1
+def runWorker(connection, buffers, numEnvs, first, last, maxTicks):
+    arrays = viewBuffers(buffers, numEnvs)
+    envs = [AsteroidsEnv(maxTicks) for _ in range(first, last)]
+    seeds = [0] * len(envs)
+    episodes = [0] * len(envs)
+
+    def store(i, observation):
+        for name in observationNames:
+            arrays[name][first + i] = observation[name]
+
+    while True:
+        command = connection.recv_bytes()
+        if command == stepCommand:
+            actions = arrays['actions']
+            for i, env in enumerate(envs):
+                observation, reward, terminated, truncated, info = env.step(
+                    actions[first + i])
+                arrays['rewards'][first + i] = reward
+                arrays['terminated'][first + i] = terminated
+                arrays['truncated'][first + i] = truncated
+                if terminated or truncated:
+                    # Each game gets its own run of seeds
+                    episodes[i] += 1
+                    observation, info = env.reset(
+                        seeds[i] + episodes[i] * numEnvs)
+                store(i, observation)
+        elif command == resetCommand:
+            seed = int(connection.recv_bytes())
+            for i, env in enumerate(envs):
+                seeds[i] = seed + first + i
+                episodes[i] = 0
+                observation, info = env.reset(seeds[i])
+                store(i, observation)
+            arrays['rewards'][first:last] = 0
+            arrays['terminated'][first:last] = False
+            arrays['truncated'][first:last] = False
+        elif command == closeCommand:
+            break
+        connection.send_bytes(command)
+    connection.close()
+
+
+class VectorEnv:
+
+    # numWorkers defaults to one per core, never more than numEnvs
+    def __init__(self, numEnvs, numWorkers=None, maxTicks=None):
+        if numWorkers is None:
+            numWorkers = multiprocessing.cpu_count()
+        numWorkers = max(1, min(numWorkers, numEnvs))
+        self.numEnvs = numEnvs
+        self.actionCount = AsteroidsEnv(maxTicks).actionCount
+
+        self.buffers = createBuffers(numEnvs)
+        arrays = viewBuffers(self.buffers, numEnvs)
+        self.observation = {name: arrays[name] for name in observationNames}
+        self.actions = arrays['actions']
+        self.rewards = arrays['rewards']
+        self.terminated = arrays['terminated']
+        self.truncated = arrays['truncated']
+
+        self.connections = []
+        self.workers = []
+        for worker in range(numWorkers):
+            first = numEnvs * worker // numWorkers
+            last = numEnvs * (worker + 1) // numWorkers
+            connection, workerConnection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=runWorker,
+                args=(workerConnection, self.buffers, numEnvs,
+                      first, last, maxTicks),
+                daemon=True)
+            process.start()
+            workerConnection.close()
+            self.connections.append(connection)
+            self.workers.append(process)
+
+    # Send the command to every worker then wait for all of them, so the
+    # workers run side by side
+    def command(self, command, data=None):
+        for connection in self.connections:
+            connection.send_bytes(command)
+            if data is not None:
+                connection.send_bytes(data)
+        for connection in self.connections:
+            connection.recv_bytes()
+
+    # Game i is seeded with seed + i
+    def reset(self, seed=0):
+        self.command(resetCommand, str(seed).encode())
+        return self.observation
+
+    # actions has one action per game, the arrays returned are the shared
+    # ones and are overwritten by the next step
+    def step(self, actions):
+        self.actions[:] = actions
+        self.command(stepCommand)
+        return self.observation, self.rewards, self.terminated, self.truncated
+
+    def close(self):
+        for connection in self.connections:
+            connection.send_bytes(closeCommand)
+        for process in self.workers:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+        self.workers = []
+
+
+if __name__ == "__main__":
+    numEnvs = 8
+    numWorkers = None
+    steps = 2000
+    for arg in sys.argv[1:]:
+        if arg.startswith('--envs='):
+            numEnvs = int(arg[len('--envs='):])
+        elif arg.startswith('--workers='):
+            numWorkers = int(arg[len('--workers='):])
+        elif arg.startswith('--steps='):
+            steps = int(arg[len('--steps='):])
+
+    envs = VectorEnv(numEnvs, numWorkers)
+    envs.reset(seed=1)
+    random = numpy.random.default_rng(1)
+    actions = random.integers(0, envs.actionCount, size=(steps, numEnvs))
+    start = time.perf_counter()
+    for step in range(steps):
+        envs.step(actions[step])
+    seconds = time.perf_counter() - start
+    print('%d games on %d workers: %d frames in %.2fs (%d frames/s)' %
+          (numEnvs, len(envs.workers), steps * numEnvs, seconds,
+           steps * numEnvs / seconds))
+    envs.close()